@@ -1,11 +1,20 @@
+import asyncio
 import logging
+import threading
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from functools import lru_cache
+from itertools import islice
 from typing import Any, Dict, List, Optional, Union
 
+import requests
+from azure.core.pipeline.transport import RequestsTransport
 from azure.cosmos import ContainerProxy, CosmosClient, DatabaseProxy, PartitionKey
 from azure.cosmos.exceptions import CosmosResourceNotFoundError
 from azure.identity import ClientSecretCredential, DefaultAzureCredential
+from cachetools import TTLCache
+from requests.adapters import HTTPAdapter
 
 # Handle both relative and absolute imports
 try:
@@ -53,6 +62,15 @@ except ImportError:
         UserUpdate,
     )
 
+# Azure AI Search is optional; resolve it once at import time instead of on
+# every search call
+try:
+    from .services.search import search_products as _ai_search_products
+    from .services.search import search_products_fast as _ai_search_products_fast
+except ImportError:
+    _ai_search_products = None
+    _ai_search_products_fast = None
+
 # pylint: disable=no-member
 # mypy: disable-error-code="attr-defined"
 
@@ -64,6 +82,115 @@ def _prepare_query_parameters(params: List[Dict[str, Any]]) -> List[Dict[str, ob
     return [{"name": p["name"], "value": p["value"]} for p in params]
 
 
+class CosmosConfigurationError(Exception):
+    """Raised when the Cosmos DB connection settings are incomplete"""
+
+
+class CosmosAuthError(Exception):
+    """Raised when the service cannot authenticate to Cosmos DB"""
+
+
+# Pooled HTTP transport shared by every CosmosClient in the process
+_cosmos_transport: Optional[RequestsTransport] = None
+
+
+def _get_cosmos_transport() -> RequestsTransport:
+    """Return the shared transport, creating its pooled session on first use"""
+    global _cosmos_transport
+    if _cosmos_transport is None:
+        session = requests.Session()
+        session.mount("https://", HTTPAdapter(pool_connections=10, pool_maxsize=50))
+        _cosmos_transport = RequestsTransport(session=session, session_owner=False)
+    return _cosmos_transport
+
+
+def _parse_iso_datetime(value: str) -> datetime:
+    """Parse an ISO 8601 timestamp from Cosmos DB, accepting a trailing 'Z' for UTC"""
+    # Python 3.11's C-level fromisoformat handles 'Z' natively; no pre-pass needed
+    return datetime.fromisoformat(value)
+
+
+# Top-level document fields that hold datetimes in the models this service writes
+_DATETIME_KEYS = frozenset(
+    {"created_at", "updated_at", "last_login", "last_message_at"}
+)
+
+# (attribute, settings.cosmos_db_containers key, partition key path)
+_CONTAINER_SPECS = (
+    ("products_container", "products", "/category"),
+    ("users_container", "users", "/id"),
+    ("chat_container", "chat_sessions", "/user_id"),
+    ("cart_container", "carts", "/user_id"),
+    ("transactions_container", "transactions", "/user_id"),
+)
+
+# Fields _deserialize_datetime_fields converts back from ISO strings
+_DESERIALIZED_DATETIME_FIELDS = ("created_at", "updated_at", "last_login")
+
+
+# get_products filters: (search param, SQL condition, query parameter name)
+_PRODUCT_FILTERS = (
+    ("category", "c.category = @category", "@category"),
+    ("min_price", "c.price >= @min_price", "@min_price"),
+    ("max_price", "c.price <= @max_price", "@max_price"),
+    ("min_rating", "c.rating >= @min_rating", "@min_rating"),
+    ("in_stock_only", "c.in_stock = true", None),
+    (
+        "query",
+        "(CONTAINS(c.title, @query, true) OR CONTAINS(c.description, @query, true))",
+        "@query",
+    ),
+)
+
+# get_products sort_by values and the document field each one orders by
+_PRODUCT_SORT_COLUMNS = {"name": "c.title", "price": "c.price", "rating": "c.rating"}
+
+
+@lru_cache(maxsize=64)
+def _build_products_query(filter_keys: tuple, sort_by: str, sort_order: str) -> str:
+    """Build (and memoize) the product SQL for a set of active filter keys"""
+    conditions = [
+        condition for key, condition, _ in _PRODUCT_FILTERS if key in filter_keys
+    ]
+    query = "SELECT * FROM c"
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    sort_column = _PRODUCT_SORT_COLUMNS.get(sort_by)
+    if sort_column:
+        query += f" ORDER BY {sort_column} {'DESC' if sort_order == 'desc' else 'ASC'}"
+    return query
+
+
+# Scalar Product fields read straight from Cosmos documents, with defaults
+_PRODUCT_SCALAR_FIELDS = (
+    ("title", ""),
+    ("price", 0.0),
+    ("rating", 4.0),
+    ("review_count", 0),
+    ("image", ""),
+    ("category", ""),
+    ("in_stock", True),
+    ("description", ""),
+)
+
+
+def _item_to_product(item: Dict[str, Any], now: Optional[datetime] = None) -> Product:
+    """Map a Cosmos DB product document to the Product model"""
+    # Missing or null timestamps default to now; batch callers pass one value
+    fields = {name: item.get(name, default) for name, default in _PRODUCT_SCALAR_FIELDS}
+    if now is None:
+        now = datetime.utcnow()
+    return Product(
+        id=item.get("id"),
+        original_price=item.get("original_price", fields["price"]),
+        tags=item.get("tags", []),
+        specifications=item.get("specifications", {}),
+        created_at=item.get("created_at") or now,
+        updated_at=item.get("updated_at") or now,
+        **fields,
+    )
+
+
 class CosmosDatabaseService(DatabaseService):
     """Cosmos DB implementation of the database service"""
 
@@ -76,13 +203,17 @@ class CosmosDatabaseService(DatabaseService):
         self.chat_container: ContainerProxy
         self.cart_container: ContainerProxy
         self.transactions_container: ContainerProxy
+        # Short-lived product lookups keyed by ("id", value) or ("sku", value)
+        self._product_cache: TTLCache = TTLCache(maxsize=256, ttl=30)
+        # Lookups run on worker threads (to_thread / run_async_sync)
+        self._product_cache_lock = threading.RLock()
+
+        # Ensure we have the endpoint
+        if not settings.cosmos_db_endpoint:
+            raise CosmosConfigurationError("Cosmos DB endpoint is required")
 
         # Use Azure credential authentication for AAD-enabled Cosmos DB
         try:
-            # Ensure we have the endpoint
-            if not settings.cosmos_db_endpoint:
-                raise Exception("Cosmos DB endpoint is required")
-
             logger.info(
                 "Attempting to authenticate to Cosmos DB with Azure credentials..."
             )
@@ -113,7 +244,11 @@ class CosmosDatabaseService(DatabaseService):
                 auth_method = "DefaultAzureCredential"
 
             # Create Cosmos client with credential (cast to Any to satisfy type checker)
-            self.client = CosmosClient(settings.cosmos_db_endpoint, credential=credential)  # type: ignore
+            self.client = CosmosClient(
+                settings.cosmos_db_endpoint,
+                credential=credential,  # type: ignore
+                transport=_get_cosmos_transport(),
+            )
             logger.info(f"Successfully created Cosmos client with {auth_method}")
 
         except Exception as e:
@@ -122,7 +257,7 @@ class CosmosDatabaseService(DatabaseService):
 
             # Check if it's an RBAC permission issue
             if "RBAC permissions" in error_msg or "principal" in error_msg:
-                raise Exception(
+                raise CosmosAuthError(
                     f"""
 ❌ RBAC Permission Error: Your service principal lacks Cosmos DB permissions.
 
@@ -144,11 +279,11 @@ To fix this, run these Azure CLI commands:
 
 Original error: {error_msg}
                 """
-                )
+                ) from e
 
             # Check if local auth is disabled
             if "Local Authorization is disabled" in error_msg:
-                raise Exception(
+                raise CosmosAuthError(
                     f"""
 ❌ Authentication Error: This Cosmos DB requires AAD authentication and your credentials don't have proper permissions.
 
@@ -159,12 +294,12 @@ Solutions:
 
 Original error: {error_msg}
                 """
-                )
+                ) from e
 
             # Generic authentication error
-            raise Exception(
+            raise CosmosAuthError(
                 f"Cannot authenticate to Cosmos DB with Azure credentials. Check your Azure login and permissions. Error: {error_msg}"
-            )
+            ) from e
 
         self.database = self.client.get_database_client(
             settings.cosmos_db_database_name
@@ -173,27 +308,39 @@ Original error: {error_msg}
 
     def _serialize_datetime_fields(self, data: dict) -> dict:
         """Convert datetime objects to ISO format for Cosmos DB serialization"""
+        datetime_keys = [
+            key
+            for key in _DATETIME_KEYS.intersection(data)
+            if isinstance(data[key], datetime)
+        ]
+        # Fall back to a type check for top-level datetimes not on the list
+        datetime_keys.extend(
+            key
+            for key, value in data.items()
+            if key not in _DATETIME_KEYS and isinstance(value, datetime)
+        )
+        if not datetime_keys:
+            # Nothing to convert, so skip copying the document
+            return data
+
         serialized_data = data.copy()
-        for key, value in serialized_data.items():
-            if isinstance(value, datetime):
-                # Ensure UTC timezone is explicitly marked
-                if value.tzinfo is None:
-                    # If no timezone info, assume it's UTC
-                    serialized_data[key] = value.replace(tzinfo=None).isoformat() + "Z"
-                else:
-                    serialized_data[key] = value.isoformat()
+        for key in datetime_keys:
+            value = serialized_data[key]
+            # Ensure UTC timezone is explicitly marked
+            if value.tzinfo is None:
+                # If no timezone info, assume it's UTC
+                serialized_data[key] = value.isoformat() + "Z"
+            else:
+                serialized_data[key] = value.isoformat()
         return serialized_data
 
     def _deserialize_datetime_fields(self, data: dict) -> dict:
         """Convert ISO string datetime fields back to datetime objects"""
         deserialized_data = data.copy()
-        datetime_fields = ["created_at", "updated_at", "last_login"]
 
-        for field in datetime_fields:
+        for field in _DESERIALIZED_DATETIME_FIELDS:
             if field in deserialized_data and isinstance(deserialized_data[field], str):
-                # Handle both 'Z' suffix and timezone info
-                dt_str = deserialized_data[field].replace("Z", "+00:00")
-                deserialized_data[field] = datetime.fromisoformat(dt_str)
+                deserialized_data[field] = _parse_iso_datetime(deserialized_data[field])
 
         return deserialized_data
 
@@ -205,36 +352,18 @@ Original error: {error_msg}
                 id=settings.cosmos_db_database_name
             )
 
-            # Create containers
-            self.products_container = self.database.create_container_if_not_exists(
-                id=settings.cosmos_db_containers["products"],
-                partition_key=PartitionKey(path="/category"),
-                offer_throughput=400,
-            )
-
-            self.users_container = self.database.create_container_if_not_exists(
-                id=settings.cosmos_db_containers["users"],
-                partition_key=PartitionKey(path="/id"),
-                offer_throughput=400,
-            )
-
-            self.chat_container = self.database.create_container_if_not_exists(
-                id=settings.cosmos_db_containers["chat_sessions"],
-                partition_key=PartitionKey(path="/user_id"),
-                offer_throughput=400,
-            )
-
-            self.cart_container = self.database.create_container_if_not_exists(
-                id=settings.cosmos_db_containers["carts"],
-                partition_key=PartitionKey(path="/user_id"),
-                offer_throughput=400,
-            )
-
-            self.transactions_container = self.database.create_container_if_not_exists(
-                id=settings.cosmos_db_containers["transactions"],
-                partition_key=PartitionKey(path="/user_id"),
-                offer_throughput=400,
-            )
+            # Containers are independent, so create them concurrently
+            with ThreadPoolExecutor(max_workers=len(_CONTAINER_SPECS)) as executor:
+                containers = executor.map(
+                    lambda spec: self.database.create_container_if_not_exists(
+                        id=settings.cosmos_db_containers[spec[1]],
+                        partition_key=PartitionKey(path=spec[2]),
+                        offer_throughput=400,
+                    ),
+                    _CONTAINER_SPECS,
+                )
+                for (attr, _, _), container in zip(_CONTAINER_SPECS, containers):
+                    setattr(self, attr, container)
 
             logger.info("Cosmos DB containers initialized successfully")
 
@@ -247,49 +376,17 @@ Original error: {error_msg}
     ) -> List[Product]:
         """Get products with optional filtering"""
         try:
-            query = "SELECT * FROM c"
             parameters = []
+            filter_keys = []
 
             if search_params:
-                conditions = []
-
-                if search_params.get("category") and search_params["category"] != "All":
-                    conditions.append("c.category = @category")
-                    parameters.append(
-                        {"name": "@category", "value": search_params["category"]}
-                    )
-
-                if search_params.get("min_price"):
-                    conditions.append("c.price >= @min_price")
-                    parameters.append(
-                        {"name": "@min_price", "value": search_params["min_price"]}
-                    )
-
-                if search_params.get("max_price"):
-                    conditions.append("c.price <= @max_price")
-                    parameters.append(
-                        {"name": "@max_price", "value": search_params["max_price"]}
-                    )
-
-                if search_params.get("min_rating"):
-                    conditions.append("c.rating >= @min_rating")
-                    parameters.append(
-                        {"name": "@min_rating", "value": search_params["min_rating"]}
-                    )
-
-                if search_params.get("in_stock_only"):
-                    conditions.append("c.in_stock = true")
-
-                if search_params.get("query"):
-                    conditions.append(
-                        "(CONTAINS(LOWER(c.title), LOWER(@query)) OR CONTAINS(LOWER(c.description), LOWER(@query)))"
-                    )
-                    parameters.append(
-                        {"name": "@query", "value": search_params["query"]}
-                    )
-
-                if conditions:
-                    query += " WHERE " + " AND ".join(conditions)
+                for key, _, param_name in _PRODUCT_FILTERS:
+                    value = search_params.get(key)
+                    if not value or (key == "category" and value == "All"):
+                        continue
+                    filter_keys.append(key)
+                    if param_name:
+                        parameters.append({"name": param_name, "value": value})
 
             # Add sorting
             sort_by = search_params.get("sort_by", "name") if search_params else "name"
@@ -297,18 +394,7 @@ Original error: {error_msg}
                 search_params.get("sort_order", "asc") if search_params else "asc"
             )
 
-            if sort_by == "name":
-                query += (
-                    f" ORDER BY c.title {'DESC' if sort_order == 'desc' else 'ASC'}"
-                )
-            elif sort_by == "price":
-                query += (
-                    f" ORDER BY c.price {'DESC' if sort_order == 'desc' else 'ASC'}"
-                )
-            elif sort_by == "rating":
-                query += (
-                    f" ORDER BY c.rating {'DESC' if sort_order == 'desc' else 'ASC'}"
-                )
+            query = _build_products_query(tuple(filter_keys), sort_by, sort_order)
 
             items = list(
                 self.products_container.query_items(
@@ -319,22 +405,10 @@ Original error: {error_msg}
             )
 
             # Convert to Product model format
+            now = datetime.utcnow()
             products = []
             for item in items:
-                product = Product(
-                    id=item.get("id"),
-                    title=item.get("title", ""),
-                    price=item.get("price", 0.0),
-                    original_price=item.get("original_price", item.get("price", 0.0)),
-                    rating=item.get("rating", 4.0),
-                    review_count=item.get("review_count", 0),
-                    image=item.get("image", ""),
-                    category=item.get("category", ""),
-                    in_stock=item.get("in_stock", True),
-                    description=item.get("description", ""),
-                    tags=item.get("tags", []),
-                    specifications=item.get("specifications", {}),
-                )
+                product = _item_to_product(item, now)
                 products.append(product)
 
             return products
@@ -345,47 +419,40 @@ Original error: {error_msg}
 
     async def get_product(self, product_id: str) -> Optional[Product]:
         """Get a single product by ID - optimized for Cosmos DB"""
+        with self._product_cache_lock:
+            cached = self._product_cache.get(("id", product_id))
+        if cached is not None:
+            return cached.model_copy(deep=True)
+
         try:
             # Use direct read for better performance (if we know the partition key)
             # For now, use cross-partition query since products might be in different partitions
             query = "SELECT * FROM c WHERE c.id = @product_id"
             parameters = [{"name": "@product_id", "value": product_id}]
 
-            items = list(
-                self.products_container.query_items(
-                    query=query,
-                    parameters=_prepare_query_parameters(parameters),
-                    enable_cross_partition_query=True,
+            # Run the blocking query off the event loop, as get_product_by_sku does
+            items = await asyncio.to_thread(
+                lambda: list(
+                    self.products_container.query_items(
+                        query=query,
+                        parameters=_prepare_query_parameters(parameters),
+                        enable_cross_partition_query=True,
+                    )
                 )
             )
 
             if items:
-                item = items[0]
-                # Convert datetime strings back to datetime objects
+                # Convert datetime strings back to datetime objects on a copy
+                item = dict(items[0])
                 for field in ["created_at", "updated_at"]:
                     if field in item and isinstance(item[field], str):
-                        item[field] = datetime.fromisoformat(
-                            item[field].replace("Z", "+00:00")
-                        )
+                        item[field] = _parse_iso_datetime(item[field])
 
                 # Map Cosmos DB fields to Product model fields
-                product = Product(
-                    id=item.get("id"),
-                    title=item.get("title", ""),
-                    price=item.get("price", 0.0),
-                    original_price=item.get("original_price", item.get("price", 0.0)),
-                    rating=item.get("rating", 4.0),
-                    review_count=item.get("review_count", 0),
-                    image=item.get("image", ""),
-                    category=item.get("category", ""),
-                    in_stock=item.get("in_stock", True),
-                    description=item.get("description", ""),
-                    tags=item.get("tags", []),
-                    specifications=item.get("specifications", {}),
-                    created_at=item.get("created_at", datetime.utcnow()),
-                    updated_at=item.get("updated_at", datetime.utcnow()),
-                )
-                return product
+                product = _item_to_product(item)
+                with self._product_cache_lock:
+                    self._product_cache[("id", product_id)] = product
+                return product.model_copy(deep=True)
             return None
 
         except Exception as e:
@@ -430,6 +497,7 @@ Original error: {error_msg}
             self.products_container.replace_item(  # type: ignore
                 item=existing_product.id, body=product_dict
             )
+            self._invalidate_product_caches()
 
             return existing_product
 
@@ -449,6 +517,7 @@ Original error: {error_msg}
             self.products_container.delete_item(  # type: ignore
                 item=product_id, partition_key=product.category
             )
+            self._invalidate_product_caches()
 
             return True
 
@@ -456,39 +525,40 @@ Original error: {error_msg}
             logger.error(f"Error deleting product from Cosmos DB: {str(e)}")
             raise
 
+    def _invalidate_product_caches(self) -> None:
+        """Drop cached product lookups after a write"""
+        with self._product_cache_lock:
+            self._product_cache.clear()
+
     async def get_product_by_sku(self, sku: str) -> Optional[Product]:
         """Get product by SKU"""
+        with self._product_cache_lock:
+            cached = self._product_cache.get(("sku", sku))
+        if cached is not None:
+            return cached.model_copy(deep=True)
+
         try:
             query = "SELECT * FROM c WHERE c.sku = @sku OR c.id = @sku"
             parameters = [{"name": "@sku", "value": sku}]
 
-            items = list(
-                self.products_container.query_items(
-                    query=query,
-                    parameters=_prepare_query_parameters(parameters),
-                    enable_cross_partition_query=True,
+            # Run the blocking query off the event loop so concurrent SKU
+            # lookups (see _products_from_search_hits) overlap
+            items = await asyncio.to_thread(
+                lambda: list(
+                    self.products_container.query_items(
+                        query=query,
+                        parameters=_prepare_query_parameters(parameters),
+                        enable_cross_partition_query=True,
+                    )
                 )
             )
 
             if items:
                 item = items[0]
-                product = Product(
-                    id=item.get("id"),
-                    title=item.get("title", ""),
-                    price=item.get("price", 0.0),
-                    original_price=item.get("original_price", item.get("price", 0.0)),
-                    rating=item.get("rating", 4.0),
-                    review_count=item.get("review_count", 0),
-                    image=item.get("image", ""),
-                    category=item.get("category", ""),
-                    in_stock=item.get("in_stock", True),
-                    description=item.get("description", ""),
-                    tags=item.get("tags", []),
-                    specifications=item.get("specifications", {}),
-                    created_at=item.get("created_at", datetime.utcnow()),
-                    updated_at=item.get("updated_at", datetime.utcnow()),
-                )
-                return product
+                product = _item_to_product(item)
+                with self._product_cache_lock:
+                    self._product_cache[("sku", sku)] = product
+                return product.model_copy(deep=True)
             return None
 
         except Exception as e:
@@ -501,6 +571,48 @@ Original error: {error_msg}
         products = await self.get_products(search_params)
         return products[:limit]
 
+    async def _products_from_search_hits(
+        self, hits: List[Dict[str, Any]]
+    ) -> List[Product]:
+        """Resolve AI Search hits to full products, looking them up concurrently"""
+        lookups = await asyncio.gather(
+            *(self.get_product_by_sku(hit["id"]) for hit in hits),
+            return_exceptions=True,
+        )
+
+        products = []
+        for hit, full_product in zip(hits, lookups):
+            if isinstance(full_product, BaseException):
+                logger.warning(
+                    f"Failed to get full product data for {hit['id']}: {full_product}"
+                )
+                continue
+            if full_product:
+                products.append(full_product)
+                continue
+
+            # Create Product from AI Search data
+            try:
+                product = Product(
+                    id=hit["id"],
+                    title=hit.get("title", ""),
+                    price=hit.get("price", 0.0),
+                    original_price=hit.get("price", 0.0),
+                    rating=4.0,  # Default rating
+                    review_count=0,
+                    image=hit.get("image", ""),
+                    category=hit.get("category", ""),
+                    in_stock=hit.get("inventory", 0) > 0,
+                    description=hit.get("description", ""),
+                    tags=hit.get("tags", ""),
+                    specifications={},
+                )
+                products.append(product)
+            except Exception as e:
+                logger.warning(f"Failed to process AI Search result {hit['id']}: {e}")
+
+        return products
+
     async def search_products_hybrid(
         self, query: str, limit: int = 10
     ) -> List[Product]:
@@ -508,9 +620,10 @@ Original error: {error_msg}
         try:
             # Strategy 1: Try Azure AI Search first (fastest, most accurate)
             try:
-                from services.search import search_products_fast  # type: ignore
+                if _ai_search_products_fast is None:
+                    raise ImportError("Azure AI Search module unavailable")
 
-                ai_search_results = search_products_fast(query, limit)
+                ai_search_results = _ai_search_products_fast(query, limit)
 
                 if ai_search_results:
                     logger.info(
@@ -518,35 +631,7 @@ Original error: {error_msg}
                     )
 
                     # Convert AI Search results to Product objects
-                    products = []
-                    for hit in ai_search_results:
-                        # Try to get full product data from Cosmos DB
-                        try:
-                            full_product = await self.get_product_by_sku(hit["id"])
-                            if full_product:
-                                products.append(full_product)
-                            else:
-                                # Create Product from AI Search data
-                                product = Product(
-                                    id=hit["id"],
-                                    title=hit.get("title", ""),
-                                    price=hit.get("price", 0.0),
-                                    original_price=hit.get("price", 0.0),
-                                    rating=4.0,  # Default rating
-                                    review_count=0,
-                                    image=hit.get("image", ""),
-                                    category=hit.get("category", ""),
-                                    in_stock=hit.get("inventory", 0) > 0,
-                                    description=hit.get("description", ""),
-                                    tags=hit.get("tags", ""),
-                                    specifications={},
-                                )
-                                products.append(product)
-                        except Exception as e:
-                            logger.warning(
-                                f"Failed to get full product data for {hit['id']}: {e}"
-                            )
-                            continue
+                    products = await self._products_from_search_hits(ai_search_results)
 
                     if products:
                         logger.info(
@@ -576,44 +661,18 @@ Original error: {error_msg}
         self, query: str, limit: int = 10
     ) -> List[Product]:
         """Search products using Azure AI Search only"""
-        try:
-            from services.search import search_products  # type: ignore
+        if _ai_search_products is None:
+            logger.warning("Azure AI Search not available")
+            return []
 
-            ai_search_results = search_products(query, limit)
+        try:
+            ai_search_results = _ai_search_products(query, limit)
 
             if not ai_search_results:
                 return []
 
             # Convert AI Search results to Product objects
-            products = []
-            for hit in ai_search_results:
-                try:
-                    # Try to get full product data from Cosmos DB
-                    full_product = await self.get_product_by_sku(hit["id"])
-                    if full_product:
-                        products.append(full_product)
-                    else:
-                        # Create Product from AI Search data
-                        product = Product(
-                            id=hit["id"],
-                            title=hit.get("title", ""),
-                            price=hit.get("price", 0.0),
-                            original_price=hit.get("price", 0.0),
-                            rating=4.0,
-                            review_count=0,
-                            image=hit.get("image", ""),
-                            category=hit.get("category", ""),
-                            in_stock=hit.get("inventory", 0) > 0,
-                            description=hit.get("description", ""),
-                            tags=hit.get("tags", ""),
-                            specifications={},
-                        )
-                        products.append(product)
-                except Exception as e:
-                    logger.warning(
-                        f"Failed to process AI Search result {hit['id']}: {e}"
-                    )
-                    continue
+            products = await self._products_from_search_hits(ai_search_results)
 
             logger.info(
                 f"AI Search returned {len(products)} products for query: {query}"
@@ -638,8 +697,8 @@ Original error: {error_msg}
                 {
                     "query": """
                         SELECT * FROM c
-                        WHERE CONTAINS(LOWER(c.title), LOWER(@query))
-                           OR CONTAINS(LOWER(c.description), LOWER(@query))
+                        WHERE CONTAINS(c.title, @query, true)
+                           OR CONTAINS(c.description, @query, true)
                         ORDER BY c.rating DESC, c.price ASC
                     """,
                     "params": [{"name": "@query", "value": query}],
@@ -657,8 +716,8 @@ Original error: {error_msg}
                 {
                     "query": """
                         SELECT * FROM c
-                        WHERE CONTAINS(LOWER(c.category), LOWER(@query))
-                           OR CONTAINS(LOWER(c.tags), LOWER(@query))
+                        WHERE CONTAINS(c.category, @query, true)
+                           OR CONTAINS(c.tags, @query, true)
                         ORDER BY c.rating DESC, c.price ASC
                     """,
                     "params": [{"name": "@query", "value": query}],
@@ -672,9 +731,9 @@ Original error: {error_msg}
                     param_name = f"@term{i}"
                     conditions.append(
                         f"""
-                        (CONTAINS(LOWER(c.title), LOWER({param_name})) OR
-                         CONTAINS(LOWER(c.description), LOWER({param_name})) OR
-                         CONTAINS(LOWER(c.category), LOWER({param_name})))
+                        (CONTAINS(c.title, {param_name}, true) OR
+                         CONTAINS(c.description, {param_name}, true) OR
+                         CONTAINS(c.category, {param_name}, true))
                     """
                     )
                     search_strategies[1]["params"].append(
@@ -696,24 +755,10 @@ Original error: {error_msg}
                         )
                     )
 
+                    now = datetime.utcnow()
                     products = []
                     for item in items[:limit]:
-                        product = Product(
-                            id=item.get("id"),
-                            title=item.get("title", ""),
-                            price=item.get("price", 0.0),
-                            original_price=item.get(
-                                "original_price", item.get("price", 0.0)
-                            ),
-                            rating=item.get("rating", 4.0),
-                            review_count=item.get("review_count", 0),
-                            image=item.get("image", ""),
-                            category=item.get("category", ""),
-                            in_stock=item.get("in_stock", True),
-                            description=item.get("description", ""),
-                            tags=item.get("tags", []),
-                            specifications=item.get("specifications", {}),
-                        )
+                        product = _item_to_product(item, now)
                         products.append(product)
 
                     if products:  # If we got results, return them
@@ -774,16 +819,19 @@ Original error: {error_msg}
             query = "SELECT * FROM c WHERE c.user_id = @customer_id ORDER BY c.created_at DESC"
             parameters = [{"name": "@customer_id", "value": customer_id}]
 
-            items = list(
-                self.transactions_container.query_items(
-                    query=query,
-                    parameters=_prepare_query_parameters(parameters),
-                    enable_cross_partition_query=False,
+            # Stop paging once `limit` orders are read instead of draining
+            # the whole result set and slicing it
+            return list(
+                islice(
+                    self.transactions_container.query_items(
+                        query=query,
+                        parameters=_prepare_query_parameters(parameters),
+                        enable_cross_partition_query=False,
+                    ),
+                    limit,
                 )
             )
 
-            return items[:limit]
-
         except Exception as e:
             logger.error(f"Error getting orders for customer {customer_id}: {e}")
             return []
@@ -838,7 +886,7 @@ Original error: {error_msg}
             if not created_at_str:
                 return False
 
-            created_at = datetime.fromisoformat(created_at_str.replace("Z", "+00:00"))
+            created_at = _parse_iso_datetime(created_at_str)
             days_since_order = (
                 datetime.utcnow() - created_at.replace(tzinfo=None)
             ).days
@@ -877,9 +925,7 @@ Original error: {error_msg}
             # Convert datetime strings back to datetime objects
             for field in ["created_at", "updated_at", "last_login"]:
                 if field in user_data and isinstance(user_data[field], str):
-                    user_data[field] = datetime.fromisoformat(
-                        user_data[field].replace("Z", "+00:00")
-                    )
+                    user_data[field] = _parse_iso_datetime(user_data[field])
 
             return User(**user_data)
 
@@ -927,9 +973,7 @@ Original error: {error_msg}
             # Convert datetime strings back to datetime objects
             for field in ["created_at", "updated_at", "last_login"]:
                 if field in user_data and isinstance(user_data[field], str):
-                    user_data[field] = datetime.fromisoformat(
-                        user_data[field].replace("Z", "+00:00")
-                    )
+                    user_data[field] = _parse_iso_datetime(user_data[field])
 
             return User(**user_data)
 
@@ -961,9 +1005,7 @@ Original error: {error_msg}
                 # Convert datetime strings back to datetime objects
                 for field in ["created_at", "updated_at", "last_login"]:
                     if field in user_data and isinstance(user_data[field], str):
-                        user_data[field] = datetime.fromisoformat(
-                            user_data[field].replace("Z", "+00:00")
-                        )
+                        user_data[field] = _parse_iso_datetime(user_data[field])
 
                 return User(**user_data)
 
@@ -1061,17 +1103,13 @@ Original error: {error_msg}
             # Convert datetime strings back to datetime objects
             for field in ["created_at", "updated_at", "last_message_at"]:
                 if field in session_data and isinstance(session_data[field], str):
-                    session_data[field] = datetime.fromisoformat(
-                        session_data[field].replace("Z", "+00:00")
-                    )
+                    session_data[field] = _parse_iso_datetime(session_data[field])
 
             # Convert message datetime fields and ensure message_count is correct
             messages = session_data.get("messages", [])
             for message in messages:
                 if "created_at" in message and isinstance(message["created_at"], str):
-                    message["created_at"] = datetime.fromisoformat(
-                        message["created_at"].replace("Z", "+00:00")
-                    )
+                    message["created_at"] = _parse_iso_datetime(message["created_at"])
 
             # Ensure message_count matches actual message count
             session_data["message_count"] = len(messages)
@@ -1101,17 +1139,15 @@ Original error: {error_msg}
                 # Convert datetime strings back to datetime objects
                 for field in ["created_at", "updated_at", "last_message_at"]:
                     if field in item and isinstance(item[field], str):
-                        item[field] = datetime.fromisoformat(
-                            item[field].replace("Z", "+00:00")
-                        )
+                        item[field] = _parse_iso_datetime(item[field])
 
                 # Convert message datetime fields
                 for message in item.get("messages", []):
                     if "created_at" in message and isinstance(
                         message["created_at"], str
                     ):
-                        message["created_at"] = datetime.fromisoformat(
-                            message["created_at"].replace("Z", "+00:00")
+                        message["created_at"] = _parse_iso_datetime(
+                            message["created_at"]
                         )
 
                 sessions.append(ChatSession(**item))
@@ -1161,6 +1197,7 @@ Original error: {error_msg}
     ) -> ChatSession:
         """Add a message to an existing chat session"""
         try:
+            now = datetime.utcnow()
             # Get existing session
             session = await self.get_chat_session(session_id, user_id)
             if not session:
@@ -1168,7 +1205,7 @@ Original error: {error_msg}
                 new_session = ChatSession(
                     id=session_id,  # Use the provided session_id as the actual ID
                     user_id=user_id,
-                    session_name=f"Chat {datetime.utcnow().strftime('%Y-%m-%d %H:%M')}",
+                    session_name=f"Chat {now.strftime('%Y-%m-%d %H:%M')}",
                     context={},
                     messages=[],
                     message_count=0,
@@ -1210,13 +1247,14 @@ Original error: {error_msg}
                 message_type=message.message_type or ChatMessageType.USER,
                 user_id=user_id,
                 metadata=message.metadata,
+                created_at=now,
             )
 
             # Add message to session
             session.messages.append(new_message)
             session.message_count = len(session.messages)
             session.last_message_at = new_message.created_at
-            session.updated_at = datetime.utcnow()
+            session.updated_at = now
 
             # Convert session to dict and serialize datetime fields
             session_dict = session.model_dump()
@@ -1333,16 +1371,12 @@ Original error: {error_msg}
             # Convert datetime strings back to datetime objects
             for field in ["created_at", "updated_at"]:
                 if field in cart_data and isinstance(cart_data[field], str):
-                    cart_data[field] = datetime.fromisoformat(
-                        cart_data[field].replace("Z", "+00:00")
-                    )
+                    cart_data[field] = _parse_iso_datetime(cart_data[field])
 
             # Convert cart items datetime fields
             for item in cart_data.get("items", []):
                 if "added_at" in item and isinstance(item["added_at"], str):
-                    item["added_at"] = datetime.fromisoformat(
-                        item["added_at"].replace("Z", "+00:00")
-                    )
+                    item["added_at"] = _parse_iso_datetime(item["added_at"])
 
             return Cart(**cart_data)
 
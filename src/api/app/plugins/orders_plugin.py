@@ -2,13 +2,72 @@ import asyncio
 import concurrent.futures
 import json
 import logging
+import threading
 
+from cachetools import TTLCache
 from semantic_kernel.functions import kernel_function
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from ..cosmos_service import get_cosmos_service
 
 logger = logging.getLogger(__name__)
 
+# Agent loops frequently re-issue the same order lookup within seconds, so
+# successful tool responses are cached briefly to avoid repeated Cosmos reads.
+_order_cache: TTLCache = TTLCache(maxsize=4096, ttl=30)
+_order_cache_lock = threading.RLock()
+
+# Fields copied into get_order_status responses, with their defaults
+_ORDER_STATUS_FIELDS = (
+    ("status", "unknown"),
+    ("total", 0),
+    ("created_at", ""),
+    ("updated_at", ""),
+)
+
+_EMPTY_JSON_LIST = "[]"
+_REFUND_SUCCESS_TEMPLATE = "Refund for order {} has been processed successfully"
+_RETURN_SUCCESS_TEMPLATE = "Return for order {} has been processed successfully"
+
+
+def _cache_get(key):
+    with _order_cache_lock:
+        return _order_cache.get(key)
+
+
+def _cache_set(key, value: str) -> None:
+    with _order_cache_lock:
+        _order_cache[key] = value
+
+
+def _invalidate_order(order_id: str) -> None:
+    """Drop cached lookups for an order whose state is about to change"""
+    with _order_cache_lock:
+        _order_cache.pop(("get_order", order_id), None)
+        _order_cache.pop(("get_order_status", order_id), None)
+        # Order lists are keyed by customer, which isn't known here
+        for key in [k for k in _order_cache if k[0] == "list_orders"]:
+            _order_cache.pop(key, None)
+
+
+def _dumps(value) -> str:
+    """Serialize a tool response, preferring orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+    # Match orjson's compact output so responses don't depend on the backend
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
+
+def _order_to_dict(order):
+    """Normalize an order returned by the Cosmos service to a plain dict"""
+    if isinstance(order, dict) or not hasattr(order, "model_dump"):
+        return order
+    return order.model_dump()
+
 
 def run_async_sync(coro):
     """Run an async coroutine synchronously, handling event loop conflicts"""
@@ -29,73 +88,74 @@ class OrdersPlugin:
     @kernel_function(description="Get order by ID and return JSON")
     def get_order(self, order_id: str) -> str:
         """Get order by ID"""
+        cache_key = ("get_order", order_id)
+        cached = _cache_get(cache_key)
+        if cached is not None:
+            return cached
         try:
             cosmos_service = get_cosmos_service()
             order = run_async_sync(cosmos_service.get_order_by_id(order_id))
             if not order:
-                return json.dumps({"error": f"No order found with ID: {order_id}"})
+                return _dumps({"error": f"No order found with ID: {order_id}"})
 
-            if hasattr(order, "model_dump"):
-                order_dict = order if isinstance(order, dict) else order.model_dump()
-            else:
-                order_dict = order
+            order_dict = _order_to_dict(order)
 
-            return json.dumps(order_dict)
+            result = _dumps(order_dict)
+            _cache_set(cache_key, result)
+            return result
         except Exception as e:
             logger.error(f"Error getting order {order_id}: {e}")
-            return json.dumps({"error": f"Failed to get order: {str(e)}"})
+            return _dumps({"error": f"Failed to get order: {str(e)}"})
 
     @kernel_function(description="List orders for a customer; returns JSON list")
     def list_orders(self, customer_id: str, limit: int = 10) -> str:
         """List orders for a customer"""
+        cache_key = ("list_orders", customer_id, limit)
+        cached = _cache_get(cache_key)
+        if cached is not None:
+            return cached
         try:
             cosmos_service = get_cosmos_service()
             orders = run_async_sync(
                 cosmos_service.get_orders_by_customer(customer_id, limit=limit)
             )
             if not orders:
-                return json.dumps([])
-
-            orders_list = []
-            for order in orders:
-                if hasattr(order, "model_dump"):
-                    orders_list.append(
-                        order if isinstance(order, dict) else order.model_dump()
-                    )
-                else:
-                    orders_list.append(order)
-
-            return json.dumps(orders_list)
+                return _EMPTY_JSON_LIST
+
+            orders_list = [_order_to_dict(order) for order in orders]
+
+            result = _dumps(orders_list)
+            _cache_set(cache_key, result)
+            return result
         except Exception as e:
             logger.error(f"Error listing orders for customer {customer_id}: {e}")
-            return json.dumps({"error": f"Failed to list orders: {str(e)}"})
+            return _dumps({"error": f"Failed to list orders: {str(e)}"})
 
     @kernel_function(description="Get order status by ID")
     def get_order_status(self, order_id: str) -> str:
         """Get order status"""
+        cache_key = ("get_order_status", order_id)
+        cached = _cache_get(cache_key)
+        if cached is not None:
+            return cached
         try:
             cosmos_service = get_cosmos_service()
             order = run_async_sync(cosmos_service.get_order_by_id(order_id))
             if not order:
-                return json.dumps({"error": f"No order found with ID: {order_id}"})
+                return _dumps({"error": f"No order found with ID: {order_id}"})
 
-            if hasattr(order, "model_dump"):
-                order_dict = order if isinstance(order, dict) else order.model_dump()
-            else:
-                order_dict = order
+            order_dict = _order_to_dict(order)
 
-            status_info = {
-                "order_id": order_id,
-                "status": order_dict.get("status", "unknown"),
-                "total": order_dict.get("total", 0),
-                "created_at": order_dict.get("created_at", ""),
-                "updated_at": order_dict.get("updated_at", ""),
-            }
+            status_info = {"order_id": order_id}
+            for field, default in _ORDER_STATUS_FIELDS:
+                status_info[field] = order_dict.get(field, default)
 
-            return json.dumps(status_info)
+            result = _dumps(status_info)
+            _cache_set(cache_key, result)
+            return result
         except Exception as e:
             logger.error(f"Error getting order status {order_id}: {e}")
-            return json.dumps({"error": f"Failed to get order status: {str(e)}"})
+            return _dumps({"error": f"Failed to get order status: {str(e)}"})
 
     @kernel_function(description="Process refund for an order")
     def process_refund(self, order_id: str, reason: str) -> str:
@@ -104,6 +164,7 @@ class OrdersPlugin:
             # This would typically update the order status in the database
             # For now, we'll simulate the process
             logger.info(f"Processing refund for order {order_id} due to: {reason}")
+            _invalidate_order(order_id)
 
             # In a real implementation, you would:
             # 1. Validate the order exists and is eligible for refund
@@ -115,13 +176,13 @@ class OrdersPlugin:
                 "order_id": order_id,
                 "refund_status": "processed",
                 "reason": reason,
-                "message": f"Refund for order {order_id} has been processed successfully",
+                "message": _REFUND_SUCCESS_TEMPLATE.format(order_id),
             }
 
-            return json.dumps(result)
+            return _dumps(result)
         except Exception as e:
             logger.error(f"Error processing refund for order {order_id}: {e}")
-            return json.dumps({"error": f"Failed to process refund: {str(e)}"})
+            return _dumps({"error": f"Failed to process refund: {str(e)}"})
 
     @kernel_function(description="Process return for an order")
     def process_return(self, order_id: str, reason: str) -> str:
@@ -130,6 +191,7 @@ class OrdersPlugin:
             # This would typically update the order status in the database
             # For now, we'll simulate the process
             logger.info(f"Processing return for order {order_id} due to: {reason}")
+            _invalidate_order(order_id)
 
             # In a real implementation, you would:
             # 1. Validate the order exists and is eligible for return
@@ -141,13 +203,13 @@ class OrdersPlugin:
                 "order_id": order_id,
                 "return_status": "processed",
                 "reason": reason,
-                "message": f"Return for order {order_id} has been processed successfully",
+                "message": _RETURN_SUCCESS_TEMPLATE.format(order_id),
             }
 
-            return json.dumps(result)
+            return _dumps(result)
         except Exception as e:
             logger.error(f"Error processing return for order {order_id}: {e}")
-            return json.dumps({"error": f"Failed to process return: {str(e)}"})
+            return _dumps({"error": f"Failed to process return: {str(e)}"})
 
     @kernel_function(
         description="Get orders within return window for a customer; returns JSON list"
@@ -161,23 +223,16 @@ class OrdersPlugin:
             )
 
             if not orders:
-                return json.dumps([])
-
-            returnable_orders = []
-            for order in orders:
-                order_dict = (
-                    order
-                    if isinstance(order, dict)
-                    else (order.model_dump() if hasattr(order, "model_dump") else order)
-                )
-                returnable_orders.append(order_dict)
-
-            return json.dumps(returnable_orders)
+                return _EMPTY_JSON_LIST
+
+            returnable_orders = [_order_to_dict(order) for order in orders]
+
+            return _dumps(returnable_orders)
         except Exception as e:
             logger.error(
                 f"Error getting returnable orders for customer {customer_id}: {e}"
             )
-            return json.dumps({"error": f"Failed to get returnable orders: {str(e)}"})
+            return _dumps({"error": f"Failed to get returnable orders: {str(e)}"})
 
     @kernel_function(
         description="Get orders from the past N days for a customer; returns JSON list"
@@ -191,25 +246,16 @@ class OrdersPlugin:
             )
 
             if not orders:
-                return json.dumps([])
-
-            orders_list = []
-            for order in orders:
-                order_dict = (
-                    order
-                    if isinstance(order, dict)
-                    else (order.model_dump() if hasattr(order, "model_dump") else order)
-                )
-                orders_list.append(order_dict)
-
-            return json.dumps(orders_list)
+                return _EMPTY_JSON_LIST
+
+            orders_list = [_order_to_dict(order) for order in orders]
+
+            return _dumps(orders_list)
         except Exception as e:
             logger.error(
                 f"Error getting orders by date range for customer {customer_id}: {e}"
             )
-            return json.dumps(
-                {"error": f"Failed to get orders by date range: {str(e)}"}
-            )
+            return _dumps({"error": f"Failed to get orders by date range: {str(e)}"})
 
     @kernel_function(
         description="Check if a specific order is still returnable (within 30-day window)"
@@ -228,9 +274,9 @@ class OrdersPlugin:
                 "return_window_days": 30,
             }
 
-            return json.dumps(result)
+            return _dumps(result)
         except Exception as e:
             logger.error(f"Error checking if order {order_id} is returnable: {e}")
-            return json.dumps(
+            return _dumps(
                 {"error": f"Failed to check if order is returnable: {str(e)}"}
             )
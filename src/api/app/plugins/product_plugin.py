@@ -8,6 +8,12 @@ from ..cosmos_service import get_cosmos_service
 
 logger = logging.getLogger(__name__)
 
+_PRODUCT_NOT_FOUND_TEMPLATE = (
+    "I couldn't find a product with ID '{}'. "
+    "Could you check the ID or try searching for products instead?"
+)
+_DESCRIPTION_PREVIEW_LENGTH = 150
+
 
 def run_async_sync(coro):
     """Helper to run async functions in sync context"""
@@ -25,6 +31,22 @@ def run_async_sync(coro):
         return asyncio.run(coro)
 
 
+def _product_field(product, name: str, default):
+    """Read one field from a Product (or dict) without dumping the whole model"""
+    if isinstance(product, dict):
+        return product.get(name, default)
+    return getattr(product, name, default)
+
+
+def _preview_description(description) -> str:
+    """Trim a product description for chat responses"""
+    if not isinstance(description, str):
+        return ""
+    if len(description) > _DESCRIPTION_PREVIEW_LENGTH:
+        return description[:_DESCRIPTION_PREVIEW_LENGTH] + "..."
+    return description
+
+
 class ProductPlugin:
     """Enhanced plugin for product search and lookup using Cosmos DB"""
 
@@ -37,17 +59,14 @@ class ProductPlugin:
             cosmos_service = get_cosmos_service()
             product = run_async_sync(cosmos_service.get_product_by_sku(product_id))
             if not product:
-                return f"I couldn't find a product with ID '{product_id}'. Could you check the ID or try searching for products instead?"
+                return _PRODUCT_NOT_FOUND_TEMPLATE.format(product_id)
 
             # Format as natural language response using Product object attributes
             response = f"**{product.title}**"
             if product.price:
                 response += f" - ${product.price}"
             if product.description:
-                desc = product.description
-                if len(desc) > 150:
-                    desc = desc[:150] + "..."
-                response += f"\n\n{desc}"
+                response += f"\n\n{_preview_description(product.description)}"
             if product.category:
                 response += f"\n\nCategory: {product.category}"
             if product.in_stock:
@@ -93,10 +112,7 @@ class ProductPlugin:
                         f"This {product.category} is priced at ${product.price}"
                     )
                 if product.description:
-                    desc = product.description
-                    if len(desc) > 150:
-                        desc = desc[:150] + "..."
-                    response_parts.append(f"{desc}")
+                    response_parts.append(_preview_description(product.description))
                 if product.in_stock:
                     response_parts.append("✅ Available in stock")
                 else:
@@ -107,14 +123,9 @@ class ProductPlugin:
                 )
 
                 for i, product in enumerate(products[:3]):  # Show top 3
-                    product_dict = (
-                        product.model_dump()
-                        if hasattr(product, "model_dump")
-                        else product
-                    )
-                    title = product_dict.get("title", "Unknown Product")
-                    price = product_dict.get("price", "N/A")
-                    category = product_dict.get("category", "paint")
+                    title = _product_field(product, "title", "Unknown Product")
+                    price = _product_field(product, "price", "N/A")
+                    category = _product_field(product, "category", "paint")
 
                     response_parts.append(f"{i+1}. **{title}** - ${price} ({category})")
 
@@ -155,13 +166,8 @@ class ProductPlugin:
             else:
                 response_parts = [f"Found {len(products)} products:"]
                 for i, product in enumerate(products[:3]):
-                    product_dict = (
-                        product.model_dump()
-                        if hasattr(product, "model_dump")
-                        else product
-                    )
-                    title = product_dict.get("title", "Unknown Product")
-                    price = product_dict.get("price", "N/A")
+                    title = _product_field(product, "title", "Unknown Product")
+                    price = _product_field(product, "price", "N/A")
                     response_parts.append(f"{i+1}. **{title}** - ${price}")
                 return "\n".join(response_parts)
 
@@ -204,11 +210,8 @@ class ProductPlugin:
             response_parts = [f"Here are our {category} products:"]
 
             for i, product in enumerate(products[:5]):
-                product_dict = (
-                    product.model_dump() if hasattr(product, "model_dump") else product
-                )
-                title = product_dict.get("title", "Unknown Product")
-                price = product_dict.get("price", "N/A")
+                title = _product_field(product, "title", "Unknown Product")
+                price = _product_field(product, "price", "N/A")
 
                 response_parts.append(f"{i+1}. **{title}** - ${price}")
 
@@ -247,8 +250,8 @@ class ProductPlugin:
             ]:  # Show top 3 categories
                 response_parts.append(f"\n**{category}:**")
                 for product in cat_products[:2]:  # Show top 2 per category
-                    title = product.get("title", "Unknown Product")
-                    price = product.get("price", "N/A")
+                    title = _product_field(product, "title", "Unknown Product")
+                    price = _product_field(product, "price", "N/A")
                     response_parts.append(f"- {title} (${price})")
 
             if len(categories) > 3:
@@ -7,6 +7,24 @@ from ..services.search import search_reference_enhanced
 
 logger = logging.getLogger(__name__)
 
+# Static replies are built once rather than on every tool call
+_LOOKUP_NOT_CONFIGURED = "I don't have access to policy information right now. Please contact our support team for assistance."
+_LOOKUP_NO_RESULTS = "I couldn't find specific information about that. Let me help you contact our support team who can assist you directly."
+_LOOKUP_ERROR = "I'm having trouble accessing policy information right now. Please contact our support team for immediate assistance."
+_POLICY_NOT_CONFIGURED = (
+    "I don't have access to policy information right now. Please contact support."
+)
+_POLICY_NO_RESULTS = (
+    "I couldn't find specific information about that. Let me help you contact support."
+)
+_POLICY_ERROR = (
+    "I'm having trouble accessing policy information. Please contact support."
+)
+_SUPPORT_CONTACT_SUFFIX = (
+    " If you need further assistance, you can call our support team at 1-800-555-0199."
+)
+_SUPPORT_KEYWORDS = ("return", "refund", "policy", "warranty")
+
 
 class ReferencePlugin:
     """Enhanced plugin for reference document lookup using Azure Search"""
@@ -20,13 +38,13 @@ class ReferencePlugin:
     def lookup(self, query: str, top: int = 3) -> str:
         """Enhanced lookup with natural language responses"""
         if not self.is_configured:
-            return "I don't have access to policy information right now. Please contact our support team for assistance."
+            return _LOOKUP_NOT_CONFIGURED
 
         try:
             hits = search_reference_enhanced(query, top)
 
             if not hits:
-                return "I couldn't find specific information about that. Let me help you contact our support team who can assist you directly."
+                return _LOOKUP_NO_RESULTS
 
             # Format response naturally using the best available information
             response_parts = []
@@ -54,17 +72,15 @@ class ReferencePlugin:
             )  # Limit to 2 most relevant parts
 
             # Add helpful context if it's about returns or policies
-            if any(
-                keyword in query.lower()
-                for keyword in ["return", "refund", "policy", "warranty"]
-            ):
-                combined_response += " If you need further assistance, you can call our support team at 1-800-555-0199."
+            query_lower = query.lower()
+            if any(keyword in query_lower for keyword in _SUPPORT_KEYWORDS):
+                combined_response += _SUPPORT_CONTACT_SUFFIX
 
             return combined_response
 
         except Exception as e:
             logger.error(f"Error searching reference documents: {e}")
-            return "I'm having trouble accessing policy information right now. Please contact our support team for immediate assistance."
+            return _LOOKUP_ERROR
 
     @kernel_function(description="Get return policy information with natural language")
     def get_return_policy(self) -> str:
@@ -85,7 +101,7 @@ class ReferencePlugin:
     def lookup_policy(self, query: str, context: str = "") -> str:
         """Enhanced policy lookup with context awareness"""
         if not self.is_configured:
-            return "I don't have access to policy information right now. Please contact support."
+            return _POLICY_NOT_CONFIGURED
 
         try:
             # Enhanced search with context
@@ -93,7 +109,7 @@ class ReferencePlugin:
             hits = search_reference_enhanced(search_query, top=3)
 
             if not hits:
-                return "I couldn't find specific information about that. Let me help you contact support."
+                return _POLICY_NO_RESULTS
 
             # Format response naturally
             response_parts = []
@@ -113,4 +129,4 @@ class ReferencePlugin:
 
         except Exception as e:
             logger.error(f"Policy lookup error: {e}")
-            return "I'm having trouble accessing policy information. Please contact support."
+            return _POLICY_ERROR
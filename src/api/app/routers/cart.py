@@ -1,3 +1,4 @@
+import logging
 import uuid
 from typing import Any, Dict
 
@@ -14,6 +15,8 @@ from ..models import (
     TransactionItem,
 )
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/api/cart", tags=["cart"])
 
 
@@ -24,9 +27,9 @@ async def add_to_cart(
     """Add item to cart"""
     try:
         user_id = current_user.get("user_id")
-        print(f"Cart ADD - Current user: {current_user}")
-        print(f"Cart ADD - User ID: {user_id}")
-        print(f"Cart ADD - Request: {request}")
+        logger.debug(f"Cart ADD - Current user: {current_user}")
+        logger.debug(f"Cart ADD - User ID: {user_id}")
+        logger.debug(f"Cart ADD - Request: {request}")
 
         if not user_id:
             raise HTTPException(status_code=401, detail="User not authenticated")
@@ -86,14 +89,14 @@ async def get_cart(current_user: Dict[str, Any] = Depends(get_current_user)):
     """Get user's cart"""
     try:
         user_id = current_user.get("user_id")
-        print(f"Cart GET - Current user: {current_user}")
-        print(f"Cart GET - User ID: {user_id}")
+        logger.debug(f"Cart GET - Current user: {current_user}")
+        logger.debug(f"Cart GET - User ID: {user_id}")
 
         if not user_id:
             raise HTTPException(status_code=401, detail="User not authenticated")
 
         cart = await get_db_service().get_cart(user_id)
-        print(f"Cart GET - Retrieved cart: {cart}")
+        logger.debug(f"Cart GET - Retrieved cart: {cart}")
 
         if not cart:
             # Create empty cart
@@ -104,10 +107,10 @@ async def get_cart(current_user: Dict[str, Any] = Depends(get_current_user)):
                 total_items=0,
                 total_price=0.0,
             )
-            print(f"Cart GET - Created empty cart: {cart}")
+            logger.debug(f"Cart GET - Created empty cart: {cart}")
         return cart
     except Exception as e:
-        print(f"Cart GET - Error: {str(e)}")
+        logger.error(f"Cart GET - Error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error fetching cart: {str(e)}")
 
 
@@ -120,9 +123,9 @@ async def update_cart_item(
     """Update cart item quantity"""
     try:
         user_id = current_user.get("user_id")
-        print(f"Cart UPDATE - Current user: {current_user}")
-        print(f"Cart UPDATE - User ID: {user_id}")
-        print(f"Cart UPDATE - Product ID: {product_id}, Quantity: {quantity}")
+        logger.debug(f"Cart UPDATE - Current user: {current_user}")
+        logger.debug(f"Cart UPDATE - User ID: {user_id}")
+        logger.debug(f"Cart UPDATE - Product ID: {product_id}, Quantity: {quantity}")
 
         if not user_id:
             raise HTTPException(status_code=401, detail="User not authenticated")
@@ -179,9 +182,9 @@ async def remove_from_cart(
     """Remove item from cart"""
     try:
         user_id = current_user.get("user_id")
-        print(f"Cart DELETE - Current user: {current_user}")
-        print(f"Cart DELETE - User ID: {user_id}")
-        print(f"Cart DELETE - Product ID: {product_id}")
+        logger.debug(f"Cart DELETE - Current user: {current_user}")
+        logger.debug(f"Cart DELETE - User ID: {user_id}")
+        logger.debug(f"Cart DELETE - Product ID: {product_id}")
 
         if not user_id:
             raise HTTPException(status_code=401, detail="User not authenticated")
@@ -239,8 +242,8 @@ async def checkout_cart(current_user: Dict[str, Any] = Depends(get_current_user)
     """Checkout cart and create order"""
     try:
         user_id = current_user.get("user_id")
-        print(f"Cart CHECKOUT - Current user: {current_user}")
-        print(f"Cart CHECKOUT - User ID: {user_id}")
+        logger.debug(f"Cart CHECKOUT - Current user: {current_user}")
+        logger.debug(f"Cart CHECKOUT - User ID: {user_id}")
 
         if not user_id:
             raise HTTPException(status_code=401, detail="User not authenticated")
@@ -250,7 +253,7 @@ async def checkout_cart(current_user: Dict[str, Any] = Depends(get_current_user)
         if not cart or not cart.items:
             raise HTTPException(status_code=400, detail="Cart is empty")
 
-        print(f"Cart CHECKOUT - Cart items: {len(cart.items)}")
+        logger.debug(f"Cart CHECKOUT - Cart items: {len(cart.items)}")
 
         # Convert cart items to transaction items
         transaction_items = []
@@ -284,7 +287,7 @@ async def checkout_cart(current_user: Dict[str, Any] = Depends(get_current_user)
         transaction = await get_db_service().create_transaction(
             transaction_data, user_id
         )
-        print(f"Cart CHECKOUT - Created transaction: {transaction.id}")
+        logger.debug(f"Cart CHECKOUT - Created transaction: {transaction.id}")
 
         # Clear the cart after successful checkout
         empty_cart = Cart(
@@ -295,7 +298,7 @@ async def checkout_cart(current_user: Dict[str, Any] = Depends(get_current_user)
             total_price=0.0,
         )
         await get_db_service().update_cart(user_id, empty_cart)
-        print(f"Cart CHECKOUT - Cleared cart for user: {user_id}")
+        logger.debug(f"Cart CHECKOUT - Cleared cart for user: {user_id}")
 
         return APIResponse(
             message="Order created successfully",
@@ -310,5 +313,5 @@ async def checkout_cart(current_user: Dict[str, Any] = Depends(get_current_user)
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Cart CHECKOUT - Error: {str(e)}")
+        logger.error(f"Cart CHECKOUT - Error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error during checkout: {str(e)}")
@@ -1,6 +1,6 @@
 import logging
 from datetime import datetime
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Optional
 
 from fastapi import APIRouter, Depends, HTTPException
 
@@ -9,7 +9,7 @@ try:
     # Try relative imports first (for Docker)
     from ..auth import get_current_user_optional
     from ..config import settings
-    from ..cosmos_service import get_cosmos_service
+    from ..cosmos_service import CosmosDatabaseService, get_cosmos_service
     from ..models import (
         APIResponse,
         ChatMessageCreate,
@@ -32,7 +32,7 @@ except ImportError:
         APIResponse,
         ChatMessageType,
     )
-    from app.cosmos_service import get_cosmos_service
+    from app.cosmos_service import CosmosDatabaseService, get_cosmos_service
 
     from app.config import settings
     from app.auth import get_current_user_optional
@@ -46,6 +46,14 @@ router = APIRouter(prefix="/api/chat", tags=["chat"])
 logger = logging.getLogger(__name__)
 
 
+CosmosProvider = Callable[[], CosmosDatabaseService]
+
+
+def get_cosmos_service_provider() -> CosmosProvider:
+    """Hand routes the service getter so construction errors hit their handlers"""
+    return get_cosmos_service
+
+
 def format_timestamp(dt: datetime) -> str:
     """Helper function to format timestamps consistently"""
     if dt.tzinfo is None:
@@ -56,7 +64,8 @@ def format_timestamp(dt: datetime) -> str:
 
 @router.get("/sessions")
 async def get_chat_sessions(
-    current_user: Optional[Dict[str, Any]] = Depends(get_current_user_optional)
+    current_user: Optional[Dict[str, Any]] = Depends(get_current_user_optional),
+    cosmos_provider: CosmosProvider = Depends(get_cosmos_service_provider),
 ):
     """Get all chat sessions for a user"""
     try:
@@ -65,7 +74,8 @@ async def get_chat_sessions(
             # Return empty list for anonymous users
             return []
 
-        sessions = await get_cosmos_service().get_chat_sessions_by_user(user_id)
+        cosmos_service = cosmos_provider()
+        sessions = await cosmos_service.get_chat_sessions_by_user(user_id)
         return [
             {
                 "id": session.id,
@@ -87,11 +97,13 @@ async def get_chat_sessions(
 async def get_chat_session(
     session_id: str,
     current_user: Optional[Dict[str, Any]] = Depends(get_current_user_optional),
+    cosmos_provider: CosmosProvider = Depends(get_cosmos_service_provider),
 ):
     """Get a specific chat session with messages"""
     try:
+        cosmos_service = cosmos_provider()
         user_id = current_user.get("user_id") if current_user else None
-        session = await get_cosmos_service().get_chat_session(session_id, user_id)
+        session = await cosmos_service.get_chat_session(session_id, user_id)
         if not session:
             raise HTTPException(status_code=404, detail="Chat session not found")
 
@@ -122,10 +134,14 @@ async def get_chat_session(
 
 
 @router.post("/sessions", response_model=APIResponse)
-async def create_chat_session(session: ChatSessionCreate):
+async def create_chat_session(
+    session: ChatSessionCreate,
+    cosmos_provider: CosmosProvider = Depends(get_cosmos_service_provider),
+):
     """Create a new chat session"""
     try:
-        new_session = await get_cosmos_service().create_chat_session(session)
+        cosmos_service = cosmos_provider()
+        new_session = await cosmos_service.create_chat_session(session)
         return APIResponse(
             message="Chat session created successfully",
             data={
@@ -142,11 +158,15 @@ async def create_chat_session(session: ChatSessionCreate):
 
 @router.put("/sessions/{session_id}")
 async def update_chat_session(
-    session_id: str, session_update: ChatSessionUpdate, user_id: Optional[str] = None
+    session_id: str,
+    session_update: ChatSessionUpdate,
+    user_id: Optional[str] = None,
+    cosmos_provider: CosmosProvider = Depends(get_cosmos_service_provider),
 ):
     """Update a chat session"""
     try:
-        updated_session = await get_cosmos_service().update_chat_session(
+        cosmos_service = cosmos_provider()
+        updated_session = await cosmos_service.update_chat_session(
             session_id, session_update, user_id
         )
         if not updated_session:
@@ -168,10 +188,15 @@ async def update_chat_session(
 
 
 @router.delete("/sessions/{session_id}")
-async def delete_chat_session(session_id: str, user_id: Optional[str] = None):
+async def delete_chat_session(
+    session_id: str,
+    user_id: Optional[str] = None,
+    cosmos_provider: CosmosProvider = Depends(get_cosmos_service_provider),
+):
     """Delete a chat session"""
     try:
-        success = await get_cosmos_service().delete_chat_session(session_id, user_id)
+        cosmos_service = cosmos_provider()
+        success = await cosmos_service.delete_chat_session(session_id, user_id)
         if not success:
             raise HTTPException(status_code=404, detail="Chat session not found")
 
@@ -238,9 +263,11 @@ async def delete_chat_session(session_id: str, user_id: Optional[str] = None):
 async def get_chat_history(
     session_id: str = "default",
     current_user: Optional[Dict[str, Any]] = Depends(get_current_user_optional),
+    cosmos_provider: CosmosProvider = Depends(get_cosmos_service_provider),
 ):
     """Get chat history for a session (legacy endpoint)"""
     try:
+        cosmos_service = cosmos_provider()
         user_id = current_user.get("user_id") if current_user else None
         # Use consistent session ID logic
         if session_id == "default":
@@ -249,7 +276,7 @@ async def get_chat_history(
             else:
                 session_id = "anonymous_default"
 
-        session = await get_cosmos_service().get_chat_session(session_id, user_id)
+        session = await cosmos_service.get_chat_session(session_id, user_id)
         if not session:
             return []
 
@@ -272,9 +299,11 @@ async def get_chat_history(
 async def send_message_legacy(
     message: ChatMessageCreate,
     current_user: Optional[Dict[str, Any]] = Depends(get_current_user_optional),
+    cosmos_provider: CosmosProvider = Depends(get_cosmos_service_provider),
 ):
     # """Send a message to the chat (legacy endpoint)"""
     try:
+        cosmos_service = cosmos_provider()
         user_id = current_user.get("user_id") if current_user else None
 
         # Use a consistent session ID based on user or default
@@ -286,7 +315,7 @@ async def send_message_legacy(
             session_id = "anonymous_default"
 
         # Add user message to session
-        await get_cosmos_service().add_message_to_session(session_id, message, user_id)
+        await cosmos_service.add_message_to_session(session_id, message, user_id)
 
         # Generate AI response with thread caching and user context
         # ai_content = await generate_ai_response(message.content, session.messages, session_id=session_id, user_id=user_id)
@@ -399,9 +428,7 @@ async def send_message_legacy(
             message_type=ChatMessageType.ASSISTANT,
             metadata={"type": "ai_response"},
         )
-        await get_cosmos_service().add_message_to_session(
-            session_id, ai_response, user_id
-        )
+        await cosmos_service.add_message_to_session(session_id, ai_response, user_id)
 
         return {
             "id": session_id,
@@ -416,10 +443,12 @@ async def send_message_legacy(
 
 @router.post("/sessions/new", response_model=APIResponse)
 async def create_new_chat_session(
-    current_user: Optional[Dict[str, Any]] = Depends(get_current_user_optional)
+    current_user: Optional[Dict[str, Any]] = Depends(get_current_user_optional),
+    cosmos_provider: CosmosProvider = Depends(get_cosmos_service_provider),
 ):
     """Create a new chat session"""
     try:
+        cosmos_service = cosmos_provider()
         user_id = current_user.get("user_id") if current_user else None
 
         # Create new session
@@ -429,7 +458,7 @@ async def create_new_chat_session(
             context={},
         )
 
-        session = await get_cosmos_service().create_chat_session(session_data)
+        session = await cosmos_service.create_chat_session(session_data)
 
         return APIResponse(
             message="New chat session created",
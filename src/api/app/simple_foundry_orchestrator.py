@@ -3,6 +3,7 @@ from __future__ import annotations
 import asyncio
 import logging
 import re
+import threading
 from typing import Any, Dict, List, Optional
 
 from cachetools import TTLCache
@@ -16,6 +17,45 @@ from .plugins.reference_plugin import ReferencePlugin
 
 logger = logging.getLogger(__name__)
 
+# Routing rules are static, so they are compiled once at import time
+
+# Product-related keywords and patterns
+_PRODUCT_PATTERNS = tuple(
+    re.compile(pattern)
+    for pattern in (
+        r"\b(paint|color|blue|red|green|white|black|shade|tone|finish)\b",
+        r"\b(product|item|buy|purchase|price|cost)\b",
+        r"\b(what.*offer|show.*product|find.*paint)\b",
+        r"\b(match.*color|color.*match|sample)\b",
+        r"\b(recommend|suggest|help.*choose)\b",
+        r"\b(interior|exterior|primer|coating)\b",
+    )
+)
+
+# Policy/support keywords and patterns
+_POLICY_PATTERNS = tuple(
+    re.compile(pattern)
+    for pattern in (
+        r"\b(return|refund|exchange|policy|warranty)\b",
+        r"\b(problem|issue|complaint|damaged|leaking)\b",
+        r"\b(ship|delivery|shipping|track)\b",
+        r"\b(help|support|contact|customer service)\b",
+        r"\b(guarantee|coverage|defect)\b",
+        r"\b(cancel|order.*status|tracking)\b",
+    )
+)
+
+_PRODUCT_INQUIRY_PHRASES = ("what products", "what do you offer", "show me products")
+_POLICY_INQUIRY_PHRASES = ("return policy", "warranty", "refund", "damaged")
+
+
+def _ends_with_question(text: str) -> bool:
+    """Check for a trailing '?' without copying the response via strip()"""
+    i = len(text) - 1
+    while i >= 0 and text[i].isspace():
+        i -= 1
+    return i >= 0 and text[i] == "?"
+
 
 class ThreadCache(TTLCache):
     """Cache for agent threads with automatic cleanup"""
@@ -76,21 +116,27 @@ async def _resolve_foundry_agent_definition(agent_id: str):
         }
 
 
+async def _get_foundry_openai_client() -> Any:
+    """Get the OpenAI client from Foundry with proper API version"""
+    client = get_foundry_client()
+    return await client.get_openai_client(  # type: ignore
+        api_version=settings.azure_openai_api_version
+    )
+
+
 async def _build_foundry_agent(
-    agent_id: str, name: str, plugins: Optional[List] = None
+    agent_id: str,
+    name: str,
+    plugins: Optional[List] = None,
+    openai_client: Optional[Any] = None,
 ) -> Optional[Any]:
     """Build a Foundry agent using direct OpenAI API calls"""
     try:
         logger.info(f"Building {name} (ID: {agent_id}) using Azure AI Foundry...")
 
-        # Get the Foundry client
-        client = get_foundry_client()
-
         try:
-            # Get the OpenAI client from Foundry with proper API version
-            openai_client = await client.get_openai_client(  # type: ignore
-                api_version=settings.azure_openai_api_version
-            )
+            if openai_client is None:
+                openai_client = await _get_foundry_openai_client()
 
             # Test connection by retrieving the assistant
             assistant = await openai_client.beta.assistants.retrieve(agent_id)
@@ -262,6 +308,15 @@ class SimpleFoundryOrchestrator:
             await init_foundry_client()
             logger.info("✅ Foundry client initialized")
 
+            # One OpenAI client is shared by every agent so they reuse the
+            # same connection pool and token cache. If it can't be fetched,
+            # each agent build retries on its own and fails independently.
+            try:
+                openai_client = await _get_foundry_openai_client()
+            except Exception as e:
+                logger.warning(f"Shared Foundry OpenAI client unavailable: {e}")
+                openai_client = None
+
             # Build the main orchestrator agent if configured
             if settings.foundry_orchestrator_agent_id:
                 logger.info("Building OrchestratorAgent...")
@@ -269,6 +324,7 @@ class SimpleFoundryOrchestrator:
                     agent_id=settings.foundry_orchestrator_agent_id,
                     name="OrchestratorAgent",
                     plugins=[ProductPlugin(), OrdersPlugin(), ReferencePlugin()],
+                    openai_client=openai_client,
                 )
                 if orchestrator_agent:
                     self.agents["OrchestratorAgent"] = orchestrator_agent
@@ -285,6 +341,7 @@ class SimpleFoundryOrchestrator:
                     agent_id=settings.foundry_product_agent_id,
                     name="ProductLookupAgent",
                     plugins=[ProductPlugin()],
+                    openai_client=openai_client,
                 )
                 if product_agent:
                     self.agents["ProductLookupAgent"] = product_agent
@@ -300,6 +357,7 @@ class SimpleFoundryOrchestrator:
                     agent_id=settings.foundry_order_agent_id,
                     name="OrderStatusAgent",
                     plugins=[OrdersPlugin()],
+                    openai_client=openai_client,
                 )
                 if order_agent:
                     self.agents["OrderStatusAgent"] = order_agent
@@ -315,6 +373,7 @@ class SimpleFoundryOrchestrator:
                     agent_id=settings.foundry_knowledge_agent_id,
                     name="KnowledgeAgent",
                     plugins=[ReferencePlugin()],
+                    openai_client=openai_client,
                 )
                 if knowledge_agent:
                     self.agents["KnowledgeAgent"] = knowledge_agent
@@ -346,48 +405,22 @@ class SimpleFoundryOrchestrator:
         """Enhanced agent selection with semantic understanding"""
         query_lower = user_text.lower()
 
-        # Product-related keywords and patterns
-        product_patterns = [
-            r"\b(paint|color|blue|red|green|white|black|shade|tone|finish)\b",
-            r"\b(product|item|buy|purchase|price|cost)\b",
-            r"\b(what.*offer|show.*product|find.*paint)\b",
-            r"\b(match.*color|color.*match|sample)\b",
-            r"\b(recommend|suggest|help.*choose)\b",
-            r"\b(interior|exterior|primer|coating)\b",
-        ]
-
-        # Policy/support keywords and patterns
-        policy_patterns = [
-            r"\b(return|refund|exchange|policy|warranty)\b",
-            r"\b(problem|issue|complaint|damaged|leaking)\b",
-            r"\b(ship|delivery|shipping|track)\b",
-            r"\b(help|support|contact|customer service)\b",
-            r"\b(guarantee|coverage|defect)\b",
-            r"\b(cancel|order.*status|tracking)\b",
-        ]
-
         # Check for product intent
         product_score = sum(
-            1 for pattern in product_patterns if re.search(pattern, query_lower)
+            1 for pattern in _PRODUCT_PATTERNS if pattern.search(query_lower)
         )
 
         # Check for policy intent
         policy_score = sum(
-            1 for pattern in policy_patterns if re.search(pattern, query_lower)
+            1 for pattern in _POLICY_PATTERNS if pattern.search(query_lower)
         )
 
         # Special cases
-        if any(
-            phrase in query_lower
-            for phrase in ["what products", "what do you offer", "show me products"]
-        ):
+        if any(phrase in query_lower for phrase in _PRODUCT_INQUIRY_PHRASES):
             logger.info("Routing to ProductLookupAgent - general product inquiry")
             return "ProductLookupAgent"
 
-        if any(
-            phrase in query_lower
-            for phrase in ["return policy", "warranty", "refund", "damaged"]
-        ):
+        if any(phrase in query_lower for phrase in _POLICY_INQUIRY_PHRASES):
             logger.info("Routing to KnowledgeAgent - policy inquiry")
             return "KnowledgeAgent"
 
@@ -475,24 +508,26 @@ class SimpleFoundryOrchestrator:
                     )
                     logger.info(f"Reusing cached thread: {thread_id}")
 
-            # Use the agent's invoke method with thread caching
-            response_content = ""
+            # Use the agent's invoke method with thread caching; chunks are
+            # collected per invocation and joined once at the end
+            response_parts: List[str] = []
             async for message in agent.invoke(messages=user_text, thread=thread):
                 if hasattr(message, "content") and message.content:
-                    response_content += str(message.content)
+                    response_parts.append(str(message.content))
 
                 # Cache the thread for future use
                 if conversation_id and hasattr(message, "thread") and message.thread:
                     cache_key = f"{conversation_id}_{target_agent_name}"
                     self.thread_cache[cache_key] = message.thread.id
 
+            response_content = "".join(response_parts)
             if response_content:
                 logger.info(
                     f"{target_agent_name} response length: {len(response_content)} chars"
                 )
                 return {
                     "messages": [response_content],
-                    "awaiting_user": response_content.strip().endswith("?"),
+                    "awaiting_user": _ends_with_question(response_content),
                     "text": response_content,
                 }
             else:
@@ -515,10 +550,24 @@ class SimpleFoundryOrchestrator:
 
 
 _simple_foundry_orchestrator_instance: SimpleFoundryOrchestrator | None = None
+# run_async_sync runs callers on separate event loops, so creation is guarded
+# by one thread lock; waiters poll it so the event loop is never blocked
+_simple_foundry_orchestrator_lock = threading.Lock()
 
 
 async def get_simple_foundry_orchestrator() -> SimpleFoundryOrchestrator:
     global _simple_foundry_orchestrator_instance
-    if _simple_foundry_orchestrator_instance is None:
-        _simple_foundry_orchestrator_instance = await SimpleFoundryOrchestrator.create()
+    if _simple_foundry_orchestrator_instance is not None:
+        return _simple_foundry_orchestrator_instance
+
+    # Concurrent first requests would otherwise each build the agents
+    while not _simple_foundry_orchestrator_lock.acquire(blocking=False):
+        await asyncio.sleep(0.05)
+    try:
+        if _simple_foundry_orchestrator_instance is None:
+            _simple_foundry_orchestrator_instance = (
+                await SimpleFoundryOrchestrator.create()
+            )
+    finally:
+        _simple_foundry_orchestrator_lock.release()
     return _simple_foundry_orchestrator_instance
@@ -2,14 +2,22 @@
 Test configuration and fixtures for endpoint testing
 """
 
-import asyncio
+import copy
 import os
 import sys
 from datetime import datetime
-from unittest.mock import AsyncMock, Mock, patch
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
 
 import pytest
+from fastapi import FastAPI
 from fastapi.testclient import TestClient
+from freezegun import freeze_time
+
+from tests.helpers import NOW
+
+_FROZEN_NOW = datetime(2023, 12, 17, 10, 30, 45)
 
 # Set test environment variables before importing modules
 os.environ["ENVIRONMENT"] = "test"
@@ -18,8 +26,10 @@ os.environ["COSMOS_DB_KEY"] = ""
 os.environ["AZURE_SEARCH_ENDPOINT"] = ""
 os.environ["AZURE_OPENAI_ENDPOINT"] = ""
 
-# Add the src/api directory to the path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "api"))
+# Add the src/api directory to the path once for the whole session
+API_DIR = str(Path(__file__).resolve().parent.parent / "api")
+if API_DIR not in sys.path:
+    sys.path.insert(0, API_DIR)
 
 # Mock the database service globally to prevent Azure connections
 with patch("app.cosmos_service.CosmosDatabaseService") as mock_cosmos_service:
@@ -58,12 +68,11 @@ with patch("app.cosmos_service.CosmosDatabaseService") as mock_cosmos_service:
     from app.models import Cart, ChatSession, Product, User, UserRole
 
 
-@pytest.fixture(scope="session")
-def event_loop():
-    """Create an instance of the default event loop for the test session."""
-    loop = asyncio.get_event_loop_policy().new_event_loop()
-    yield loop
-    loop.close()
+@pytest.fixture
+def frozen_now():
+    """Pin the clock so write paths stamp a known, naive-UTC timestamp"""
+    with freeze_time(_FROZEN_NOW):
+        yield _FROZEN_NOW
 
 
 @pytest.fixture
@@ -127,8 +136,8 @@ def sample_user():
         email="test@example.com",
         role=UserRole.CUSTOMER,
         preferences={},
-        created_at=datetime.utcnow(),
-        updated_at=datetime.utcnow(),
+        created_at=NOW,
+        updated_at=NOW,
     )
 
 
@@ -147,8 +156,8 @@ def sample_product():
         in_stock=True,
         tags=["test", "sample"],
         specifications={"color": "blue", "size": "medium"},
-        created_at=datetime.utcnow(),
-        updated_at=datetime.utcnow(),
+        created_at=NOW,
+        updated_at=NOW,
     )
 
 
@@ -160,11 +169,11 @@ def sample_chat_session():
         user_id="user-123",
         session_name="Test Chat",
         message_count=2,
-        last_message_at=datetime.utcnow(),
+        last_message_at=NOW,
         is_active=True,
         messages=[],
-        created_at=datetime.utcnow(),
-        updated_at=datetime.utcnow(),
+        created_at=NOW,
+        updated_at=NOW,
     )
 
 
@@ -177,17 +186,105 @@ def sample_cart():
         items=[],
         total_items=0,
         total_price=0.0,
-        created_at=datetime.utcnow(),
-        updated_at=datetime.utcnow(),
+        created_at=NOW,
+        updated_at=NOW,
     )
 
 
+@pytest.fixture(scope="session")
+def _session_client():
+    """Single TestClient, and app lifespan, shared by the session"""
+    with TestClient(app, raise_server_exceptions=False) as test_client:
+        yield test_client
+
+
 @pytest.fixture
-def client(mock_db_service):
+def client(_session_client, mock_db_service):
     """FastAPI test client fixture with mocked dependencies"""
-    # Simple approach - just patch the main database services
+    # Patch the service getters per test so they never outlive it
     with patch("app.database.get_db_service", return_value=mock_db_service), patch(
         "app.cosmos_service.get_cosmos_service", return_value=mock_db_service
     ):
-        with TestClient(app) as test_client:
-            yield test_client
+        yield _session_client
+
+
+@pytest.fixture(scope="module")
+def _spec_cosmos_template():
+    """Uninitialized CosmosDatabaseService stand-in with real datetime helpers"""
+    from app.cosmos_service import CosmosDatabaseService
+
+    service = Mock(spec=CosmosDatabaseService)
+    service._serialize_datetime_fields = (
+        CosmosDatabaseService._serialize_datetime_fields.__get__(service)
+    )
+    service._deserialize_datetime_fields = (
+        CosmosDatabaseService._deserialize_datetime_fields.__get__(service)
+    )
+    return service
+
+
+@pytest.fixture
+def spec_cosmos(_spec_cosmos_template):
+    """Per-test view of the cached spec'd Cosmos service"""
+    return copy.copy(_spec_cosmos_template)
+
+
+@pytest.fixture
+def cosmos_patches(monkeypatch):
+    """Settings, CosmosClient and DefaultAzureCredential doubles for cosmos_service"""
+    import app.cosmos_service as cosmos_module
+
+    fake_settings = MagicMock()
+    fake_settings.cosmos_db_endpoint = "https://test-cosmos.documents.azure.com:443/"
+    fake_settings.cosmos_db_database_name = "test-db"
+    fake_settings.cosmos_db_containers = {
+        "products": "products",
+        "users": "users",
+        "chat_sessions": "chat_sessions",
+        "carts": "carts",
+        "transactions": "transactions",
+    }
+    fake_settings.azure_client_id = None
+    fake_settings.azure_client_secret = None
+    fake_settings.azure_tenant_id = None
+
+    patches = SimpleNamespace(
+        settings=fake_settings, client=MagicMock(), credential=MagicMock()
+    )
+    monkeypatch.setattr(cosmos_module, "settings", patches.settings)
+    monkeypatch.setattr(cosmos_module, "CosmosClient", patches.client)
+    monkeypatch.setattr(cosmos_module, "DefaultAzureCredential", patches.credential)
+    return patches
+
+
+def _failing_ai_search(*args, **kwargs):
+    raise Exception("AI Search unavailable")
+
+
+@pytest.fixture
+def failing_search(monkeypatch):
+    """Make the AI Search functions bound in cosmos_service raise"""
+    import app.cosmos_service as cosmos_module
+
+    monkeypatch.setattr(cosmos_module, "_ai_search_products", _failing_ai_search)
+    monkeypatch.setattr(cosmos_module, "_ai_search_products_fast", _failing_ai_search)
+
+
+@pytest.fixture(scope="session")
+def chat_client():
+    """Test client for an app serving only the chat router"""
+    from app.routers.chat import router as chat_router
+
+    chat_app = FastAPI(exception_handlers=app.exception_handlers)
+    chat_app.include_router(chat_router)
+    # Share the main app's overrides so tests and the reset fixture cover both
+    chat_app.dependency_overrides = app.dependency_overrides
+    with TestClient(chat_app, raise_server_exceptions=False) as test_client:
+        yield test_client
+
+
+@pytest.fixture(autouse=True)
+def reset_dependency_overrides():
+    """Keep dependency overrides from leaking between tests on the shared client"""
+    yield
+    app.dependency_overrides.clear()
@@ -0,0 +1,8 @@
+"""
+Shared constants for the test modules
+"""
+
+from datetime import datetime, timezone
+
+# Fixed timestamp for model fixtures; import it instead of redefining per module
+NOW = datetime(2025, 1, 1, 12, 0, 0, tzinfo=timezone.utc)
@@ -1,7 +1,9 @@
-from datetime import datetime
 from unittest.mock import AsyncMock, Mock, patch
 
+from app.main import app
 from app.models import Cart, Product, User, UserRole
+from app.routers.chat import get_cosmos_service_provider, get_current_user_optional
+from tests.helpers import NOW
 
 
 class TestAPIIntegration:
@@ -26,8 +28,8 @@ class TestAPIIntegration:
             email="integration@test.com",
             role=UserRole.CUSTOMER,
             preferences={},
-            created_at=datetime.utcnow(),
-            updated_at=datetime.utcnow(),
+            created_at=NOW,
+            updated_at=NOW,
         )
 
         product = Product(
@@ -48,8 +50,8 @@ class TestAPIIntegration:
             items=[],
             total_items=0,
             total_price=0.0,
-            created_at=datetime.utcnow(),
-            updated_at=datetime.utcnow(),
+            created_at=NOW,
+            updated_at=NOW,
         )
 
         mock_db_service = Mock()
@@ -135,17 +137,18 @@ class TestAPIIntegration:
         response = client.get("/api/nonexistent-endpoint")
         assert response.status_code == 404
 
-    @patch("app.routers.chat.get_cosmos_service")
-    @patch("app.routers.chat.get_current_user_optional")
-    def test_chat_integration_workflow(self, mock_get_user, mock_cosmos, client):
+    def test_chat_integration_workflow(self, client):
         """Test chat functionality integration"""
         # Setup authenticated user
-        mock_get_user.return_value = {"user_id": "chat-user"}
+        current_user = {"user_id": "chat-user"}
+        app.dependency_overrides[get_current_user_optional] = lambda: current_user
 
         # Setup cosmos service
         mock_cosmos_service = Mock()
         mock_cosmos_service.get_chat_sessions_by_user = AsyncMock(return_value=[])
-        mock_cosmos.return_value = mock_cosmos_service
+        app.dependency_overrides[get_cosmos_service_provider] = lambda: (
+            lambda: mock_cosmos_service
+        )
 
         # Test getting chat sessions
         response = client.get("/api/chat/sessions")
@@ -154,7 +157,7 @@ class TestAPIIntegration:
         assert isinstance(sessions, list)
 
         # Test anonymous user chat sessions
-        mock_get_user.return_value = None
+        current_user = None
         response = client.get("/api/chat/sessions")
         assert response.status_code == 200
         sessions = response.json()
@@ -0,0 +1,104 @@
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+from cachetools import TTLCache
+
+import app.plugins.orders_plugin as orders_plugin
+from app.plugins.orders_plugin import OrdersPlugin
+
+ORDER = {"id": "order-1", "user_id": "user-1", "status": "delivered", "total": 42.0}
+
+
+class _Clock:
+    """Manually advanced timer for TTLCache"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Swap the module cache for an empty one driven by a fake clock"""
+    timer = _Clock()
+    monkeypatch.setattr(
+        orders_plugin,
+        "_order_cache",
+        TTLCache(maxsize=4096, ttl=30, timer=timer),
+    )
+    return timer
+
+
+@pytest.fixture
+def cosmos(monkeypatch, clock):
+    """Cosmos service double returning one order"""
+    service = Mock()
+    service.get_order_by_id = AsyncMock(return_value=dict(ORDER))
+    service.get_orders_by_customer = AsyncMock(return_value=[dict(ORDER)])
+    monkeypatch.setattr(orders_plugin, "get_cosmos_service", lambda: service)
+    return service
+
+
+def test_get_order_second_lookup_served_from_cache(cosmos):
+    """Test a repeated lookup returns the cached response without Cosmos"""
+    plugin = OrdersPlugin()
+
+    first = plugin.get_order("order-1")
+    second = plugin.get_order("order-1")
+
+    assert first == second
+    assert cosmos.get_order_by_id.await_count == 1
+
+
+def test_get_order_cache_expires_after_ttl(cosmos, clock):
+    """Test cached lookups are refetched once the 30 second TTL passes"""
+    plugin = OrdersPlugin()
+
+    plugin.get_order("order-1")
+    clock.now += 29
+    plugin.get_order("order-1")
+    assert cosmos.get_order_by_id.await_count == 1
+
+    clock.now += 2
+    plugin.get_order("order-1")
+    assert cosmos.get_order_by_id.await_count == 2
+
+
+def test_get_order_not_found_is_not_cached(cosmos):
+    """Test a missing order is looked up again on the next call"""
+    cosmos.get_order_by_id.return_value = None
+    plugin = OrdersPlugin()
+
+    plugin.get_order("missing")
+    plugin.get_order("missing")
+
+    assert cosmos.get_order_by_id.await_count == 2
+
+
+@pytest.mark.parametrize("action", ["process_refund", "process_return"])
+def test_refund_or_return_drops_cached_order(cosmos, action):
+    """Test refunds and returns invalidate the order's cached lookups"""
+    plugin = OrdersPlugin()
+    plugin.get_order("order-1")
+    plugin.get_order_status("order-1")
+    plugin.list_orders("user-1")
+
+    getattr(plugin, action)("order-1", "damaged")
+
+    plugin.get_order("order-1")
+    plugin.get_order_status("order-1")
+    plugin.list_orders("user-1")
+    assert cosmos.get_order_by_id.await_count == 4
+    assert cosmos.get_orders_by_customer.await_count == 2
+
+
+def test_dumps_fallback_matches_orjson_format(monkeypatch):
+    """Test the json fallback emits the same compact JSON as orjson"""
+    value = {"order_id": "order-1", "items": [1, 2], "note": "café"}
+    expected = '{"order_id":"order-1","items":[1,2],"note":"café"}'
+
+    assert orders_plugin._dumps(value) == expected
+    monkeypatch.setattr(orders_plugin, "orjson", None)
+    assert orders_plugin._dumps(value) == expected
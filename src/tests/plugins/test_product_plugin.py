@@ -0,0 +1,57 @@
+import pytest
+
+import app.plugins.product_plugin as product_plugin
+from app.cosmos_service import CosmosDatabaseService
+from app.models import ProductUpdate
+from app.plugins.product_plugin import ProductPlugin
+
+
+def _product_doc(price):
+    """Cosmos product document as returned by query_items"""
+    return {
+        "id": "prod-1",
+        "title": "Snow Veil",
+        "price": price,
+        "category": "Paint",
+        "in_stock": True,
+        "created_at": "2024-01-01T00:00:00Z",
+        "updated_at": "2024-01-01T00:00:00Z",
+    }
+
+
+@pytest.fixture
+def service(cosmos_patches, monkeypatch):
+    """Real CosmosDatabaseService over mocked containers, used by the plugin"""
+    cosmos_service = CosmosDatabaseService()
+    monkeypatch.setattr(product_plugin, "get_cosmos_service", lambda: cosmos_service)
+    return cosmos_service
+
+
+def test_get_by_id_served_from_cache(service):
+    """Test a repeated lookup is served by the service's product cache"""
+    query_items = service.products_container.query_items
+    query_items.return_value = [_product_doc(19.99)]
+    plugin = ProductPlugin()
+
+    first = plugin.get_by_id("prod-1")
+    second = plugin.get_by_id("prod-1")
+
+    assert first == second
+    assert "$19.99" in first
+    assert query_items.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_get_by_id_sees_update(service):
+    """Test a lookup after update_product returns the new data, not a cached reply"""
+    query_items = service.products_container.query_items
+    query_items.return_value = [_product_doc(19.99)]
+    plugin = ProductPlugin()
+    assert "$19.99" in plugin.get_by_id("prod-1")
+
+    await service.update_product("prod-1", ProductUpdate(price=24.99))
+    query_items.return_value = [_product_doc(24.99)]
+
+    response = plugin.get_by_id("prod-1")
+    assert "$24.99" in response
+    assert "$19.99" not in response
@@ -1,17 +1,12 @@
-from datetime import datetime, timezone
 from unittest.mock import AsyncMock, patch
 
-# Import the FastAPI app
-from app.main import app
 from app.models import Cart, CartItem, Product
-from fastapi.testclient import TestClient
-
-client = TestClient(app)
+from tests.helpers import NOW
 
 
 @patch("app.routers.cart.get_current_user")
 @patch("app.routers.cart.get_db_service")
-def test_get_cart_success(mock_get_db, mock_get_user):
+def test_get_cart_success(mock_get_db, mock_get_user, client):
     """Test GET cart endpoint"""
     mock_get_user.return_value = {"user_id": "test-user-123"}
     mock_db = mock_get_db.return_value
@@ -31,8 +26,8 @@ def test_get_cart_success(mock_get_db, mock_get_user):
         ],
         total_items=2,
         total_price=39.98,
-        created_at=datetime.now(timezone.utc),
-        updated_at=datetime.now(timezone.utc),
+        created_at=NOW,
+        updated_at=NOW,
     )
     mock_db.get_cart = AsyncMock(return_value=mock_cart)
 
@@ -47,7 +42,7 @@ def test_get_cart_success(mock_get_db, mock_get_user):
 
 @patch("app.routers.cart.get_current_user")
 @patch("app.routers.cart.get_db_service")
-def test_get_cart_not_found(mock_get_db, mock_get_user):
+def test_get_cart_not_found(mock_get_db, mock_get_user, client):
     """Test GET cart endpoint when cart doesn't exist"""
     mock_get_user.return_value = {"user_id": "test-user-123"}
     mock_db = mock_get_db.return_value
@@ -63,7 +58,7 @@ def test_get_cart_not_found(mock_get_db, mock_get_user):
 
 @patch("app.routers.cart.get_current_user")
 @patch("app.routers.cart.get_db_service")
-def test_add_to_cart_success(mock_get_db, mock_get_user):
+def test_add_to_cart_success(mock_get_db, mock_get_user, client):
     """Test POST add to cart endpoint"""
     mock_get_user.return_value = {"user_id": "test-user-123"}
     mock_db = mock_get_db.return_value
@@ -80,8 +75,8 @@ def test_add_to_cart_success(mock_get_db, mock_get_user):
         review_count=10,
         tags=[],
         specifications={},
-        created_at=datetime.now(timezone.utc),
-        updated_at=datetime.now(timezone.utc),
+        created_at=NOW,
+        updated_at=NOW,
     )
     mock_db.get_product = AsyncMock(return_value=mock_product)
 
@@ -103,7 +98,7 @@ def test_add_to_cart_success(mock_get_db, mock_get_user):
 
 @patch("app.routers.cart.get_current_user")
 @patch("app.routers.cart.get_db_service")
-def test_add_to_cart_product_not_found(mock_get_db, mock_get_user):
+def test_add_to_cart_product_not_found(mock_get_db, mock_get_user, client):
     """Test add to cart with non-existent product"""
     mock_get_user.return_value = {"user_id": "test-user-123"}
     mock_db = mock_get_db.return_value
@@ -121,7 +116,7 @@ def test_add_to_cart_product_not_found(mock_get_db, mock_get_user):
 
 @patch("app.routers.cart.get_current_user")
 @patch("app.routers.cart.get_db_service")
-def test_update_cart_item_success(mock_get_db, mock_get_user):
+def test_update_cart_item_success(mock_get_db, mock_get_user, client):
     """Test PUT update cart item endpoint"""
     mock_get_user.return_value = {"user_id": "test-user-123"}
     mock_db = mock_get_db.return_value
@@ -155,7 +150,7 @@ def test_update_cart_item_success(mock_get_db, mock_get_user):
 
 @patch("app.routers.cart.get_current_user")
 @patch("app.routers.cart.get_db_service")
-def test_remove_cart_item_success(mock_get_db, mock_get_user):
+def test_remove_cart_item_success(mock_get_db, mock_get_user, client):
     """Test DELETE remove cart item endpoint"""
     mock_get_user.return_value = {"user_id": "test-user-123"}
     mock_db = mock_get_db.return_value
@@ -175,8 +170,8 @@ def test_remove_cart_item_success(mock_get_db, mock_get_user):
         ],
         total_items=2,
         total_price=39.98,
-        created_at=datetime.now(timezone.utc),
-        updated_at=datetime.now(timezone.utc),
+        created_at=NOW,
+        updated_at=NOW,
     )
     mock_db.get_cart = AsyncMock(return_value=existing_cart)
     mock_db.update_cart = AsyncMock()
@@ -189,7 +184,7 @@ def test_remove_cart_item_success(mock_get_db, mock_get_user):
 
 @patch("app.routers.cart.get_current_user")
 @patch("app.routers.cart.get_db_service")
-def test_clear_cart_success(mock_get_db, mock_get_user):
+def test_clear_cart_success(mock_get_db, mock_get_user, client):
     """Test DELETE clear cart endpoint"""
     mock_get_user.return_value = {"user_id": "test-user-123"}
     mock_db = mock_get_db.return_value
@@ -209,8 +204,8 @@ def test_clear_cart_success(mock_get_db, mock_get_user):
         ],
         total_items=1,
         total_price=19.99,
-        created_at=datetime.now(timezone.utc),
-        updated_at=datetime.now(timezone.utc),
+        created_at=NOW,
+        updated_at=NOW,
     )
     mock_db.get_cart = AsyncMock(return_value=existing_cart)
     mock_db.update_cart = AsyncMock()
@@ -223,7 +218,7 @@ def test_clear_cart_success(mock_get_db, mock_get_user):
 
 @patch("app.routers.cart.get_current_user")
 @patch("app.routers.cart.get_db_service")
-def test_cart_checkout_endpoint(mock_get_db, mock_get_user):
+def test_cart_checkout_endpoint(mock_get_db, mock_get_user, client):
     """Test cart checkout endpoint for coverage"""
     mock_get_user.return_value = {"user_id": "test-user-123"}
     mock_db = mock_get_db.return_value
@@ -1,34 +1,104 @@
-from datetime import datetime, timezone
-from unittest.mock import AsyncMock, Mock, patch
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
 
+import pytest
+
+from app.cosmos_service import CosmosDatabaseService
+from app.main import app
 from app.models import ChatMessage, ChatMessageType, ChatSession
+from app.routers.chat import get_cosmos_service_provider, get_current_user_optional
+from tests.helpers import NOW
+
+CHAT_COSMOS_METHODS = (
+    "add_message_to_session",
+    "create_chat_session",
+    "delete_chat_session",
+    "get_chat_session",
+    "get_chat_sessions_by_user",
+    "update_chat_session",
+)
+
+NEW_SESSION_PAYLOAD = {"session_name": "New Chat"}
+USER_MESSAGE_PAYLOAD = {"content": "Hello", "message_type": "user"}
+TEST_MESSAGE_PAYLOAD = {"content": "Test message", "message_type": "user"}
+
+
+def override_chat_dependencies(cosmos_service, user=None):
+    """Point the chat router's dependencies at test doubles for one test"""
+    app.dependency_overrides[get_cosmos_service_provider] = lambda: (
+        lambda: cosmos_service
+    )
+    app.dependency_overrides[get_current_user_optional] = lambda: user
+
+
+def override_failing_cosmos(user, error):
+    """Make building the Cosmos service raise, as when its config is broken"""
+    provider = Mock(side_effect=error)
+    app.dependency_overrides[get_cosmos_service_provider] = lambda: provider
+    app.dependency_overrides[get_current_user_optional] = lambda: user
+    return provider
+
+
+def assert_error_body(response):
+    """Parse the response once and check it uses the custom error format"""
+    body = response.json()
+    assert "message" in body or "error" in body
+    return body
+
+
+@pytest.fixture(scope="module")
+def cosmos_mock_template():
+    """Spec-bound Cosmos service mock shared by the chat router tests"""
+    mock = MagicMock(spec=CosmosDatabaseService)
+    for name in CHAT_COSMOS_METHODS:
+        setattr(mock, name, AsyncMock())
+    return mock
+
+
+@pytest.fixture
+def cosmos_mock(cosmos_mock_template):
+    cosmos_mock_template.reset_mock(return_value=True, side_effect=True)
+    return cosmos_mock_template
+
 
+@pytest.fixture(scope="module")
+def session_template():
+    """Known-good ChatSession that tests customise with model_copy"""
+    return ChatSession.model_construct(
+        id="session-1",
+        user_id="user-123",
+        session_name="Chat 1",
+        message_count=0,
+        last_message_at=NOW,
+        is_active=True,
+        messages=[],
+        created_at=NOW,
+        updated_at=NOW,
+    )
 
-@patch("app.routers.chat.get_current_user_optional")
-@patch("app.routers.chat.get_cosmos_service")
-def test_get_chat_sessions_authenticated(mock_cosmos, mock_get_user, client):
+
+@pytest.fixture(scope="module")
+def message_template():
+    """Known-good ChatMessage that tests customise with model_copy"""
+    return ChatMessage.model_construct(
+        id="msg-1",
+        content="Hello",
+        message_type=ChatMessageType.USER,
+        session_id="session-1",
+        created_at=NOW,
+        updated_at=NOW,
+    )
+
+
+def test_get_chat_sessions_authenticated(chat_client, cosmos_mock, session_template):
     """Test GET /api/chat/sessions endpoint for authenticated user"""
-    mock_get_user.return_value = {"user_id": "user-123"}
-
-    sessions = [
-        ChatSession(
-            id="session-1",
-            user_id="user-123",
-            session_name="Chat 1",
-            message_count=5,
-            last_message_at=datetime.now(timezone.utc),
-            is_active=True,
-            messages=[],
-            created_at=datetime.now(timezone.utc),
-            updated_at=datetime.now(timezone.utc),
-        )
-    ]
+    user = {"user_id": "user-123"}
 
-    mock_cosmos_service = Mock()
-    mock_cosmos_service.get_chat_sessions_by_user = AsyncMock(return_value=sessions)
-    mock_cosmos.return_value = mock_cosmos_service
+    sessions = [session_template.model_copy(update={"message_count": 5})]
 
-    response = client.get("/api/chat/sessions")
+    cosmos_mock.get_chat_sessions_by_user.return_value = sessions
+    override_chat_dependencies(cosmos_mock, user)
+
+    response = chat_client.get("/api/chat/sessions")
     assert response.status_code == 200
     data = response.json()
     assert len(data) == 1
@@ -36,77 +106,91 @@ def test_get_chat_sessions_authenticated(mock_cosmos, mock_get_user, client):
     assert data[0]["session_name"] == "Chat 1"
 
 
-@patch("app.routers.chat.get_current_user_optional")
-def test_get_chat_sessions_anonymous(mock_get_user, client):
+def test_get_chat_sessions_anonymous(chat_client, cosmos_mock):
     """Test GET /api/chat/sessions endpoint for anonymous user"""
-    mock_get_user.return_value = None
+    override_chat_dependencies(cosmos_mock, None)
 
-    response = client.get("/api/chat/sessions")
+    response = chat_client.get("/api/chat/sessions")
     # Anonymous users may get graceful fallback (500) or success (200)
     assert response.status_code in [200, 500]
-    data = response.json()
 
     if response.status_code == 200:
-        assert len(data) == 0
+        assert len(response.json()) == 0
     else:
-        # Should have error message in custom format
-        assert "message" in data or "error" in data
+        assert_error_body(response)
+
+
+@pytest.mark.parametrize(
+    "verb,path,attr,payload",
+    [
+        ("get", "/api/chat/sessions", "get_chat_sessions_by_user", None),
+        (
+            "put",
+            "/api/chat/sessions/session-1",
+            "update_chat_session",
+            {"session_name": "Updated"},
+        ),
+        ("get", "/api/chat/history", "get_chat_session", None),
+        ("post", "/api/chat/sessions/new", "create_chat_session", None),
+    ],
+)
+def test_chat_endpoints_database_error(
+    verb, path, attr, payload, chat_client, cosmos_mock
+):
+    """Test chat endpoints return the error envelope when Cosmos fails"""
+    getattr(cosmos_mock, attr).side_effect = Exception("Database error")
+    override_chat_dependencies(cosmos_mock, {"user_id": "user-123"})
 
+    kwargs = {"json": payload} if payload is not None else {}
+    response = getattr(chat_client, verb)(path, **kwargs)
+    assert response.status_code == 500
+    body = assert_error_body(response)
+    assert "error" in body
+    assert body["success"] is False
+
+
+@pytest.mark.parametrize(
+    "path,detail",
+    [
+        ("/api/chat/sessions", "Error fetching chat sessions"),
+        ("/api/chat/history", "Error fetching chat history"),
+    ],
+)
+def test_chat_endpoints_cosmos_construction_error(path, detail, chat_client):
+    """Test a failure to build the Cosmos service surfaces the route's own error"""
+    override_failing_cosmos({"user_id": "user-123"}, Exception("no endpoint"))
+
+    response = chat_client.get(path)
+    assert response.status_code == 500
+    assert response.json()["message"] == f"{detail}: no endpoint"
 
-@patch("app.routers.chat.get_current_user_optional")
-@patch("app.routers.chat.get_cosmos_service")
-def test_get_chat_sessions_error_handling(mock_cosmos, mock_get_user, client):
-    """Test GET /api/chat/sessions endpoint error handling"""
-    mock_get_user.return_value = {"user_id": "user-123"}
 
-    mock_cosmos_service = Mock()
-    mock_cosmos_service.get_chat_sessions_by_user = AsyncMock(
-        side_effect=Exception("Database error")
-    )
-    mock_cosmos.return_value = mock_cosmos_service
+def test_get_chat_sessions_anonymous_skips_cosmos(chat_client):
+    """Test anonymous session listing never builds the Cosmos service"""
+    provider = override_failing_cosmos(None, Exception("no endpoint"))
 
-    response = client.get("/api/chat/sessions")
-    assert response.status_code == 500
-    data = response.json()
-    assert "error" in data
-    assert "success" in data
-    assert data["success"] is False
+    response = chat_client.get("/api/chat/sessions")
+    assert response.status_code == 200
+    assert response.json() == []
+    provider.assert_not_called()
 
 
-@patch("app.routers.chat.get_current_user_optional")
-@patch("app.routers.chat.get_cosmos_service")
-def test_get_chat_session_by_id_success(mock_cosmos, mock_get_user, client):
+def test_get_chat_session_by_id_success(
+    chat_client, cosmos_mock, session_template, message_template
+):
     """Test GET /api/chat/sessions/{session_id} endpoint"""
-    mock_get_user.return_value = {"user_id": "user-123"}
+    user = {"user_id": "user-123"}
 
-    messages = [
-        ChatMessage(
-            id="msg-1",
-            content="Hello",
-            message_type=ChatMessageType.USER,
-            session_id="session-1",
-            created_at=datetime.now(timezone.utc),
-            updated_at=datetime.now(timezone.utc),
-        )
-    ]
+    messages = [message_template.model_copy()]
 
-    session = ChatSession(
-        id="session-1",
-        user_id="user-123",
-        session_name="Test Chat",
-        message_count=1,
-        last_message_at=datetime.now(timezone.utc),
-        is_active=True,
-        messages=messages,
-        created_at=datetime.now(timezone.utc),
-        updated_at=datetime.now(timezone.utc),
+    session = session_template.model_copy(
+        update={"session_name": "Test Chat", "message_count": 1, "messages": messages}
     )
 
-    mock_cosmos_service = Mock()
-    mock_cosmos_service.get_chat_session = AsyncMock(return_value=session)
-    mock_cosmos.return_value = mock_cosmos_service
+    cosmos_mock.get_chat_session.return_value = session
+    override_chat_dependencies(cosmos_mock, user)
 
-    response = client.get("/api/chat/sessions/session-1")
+    response = chat_client.get("/api/chat/sessions/session-1")
     assert response.status_code == 200
     data = response.json()
     assert data["id"] == "session-1"
@@ -114,101 +198,75 @@ def test_get_chat_session_by_id_success(mock_cosmos, mock_get_user, client):
     assert len(data["messages"]) == 1
 
 
-@patch("app.routers.chat.get_current_user_optional")
-@patch("app.routers.chat.get_cosmos_service")
-def test_get_chat_session_not_found(mock_cosmos, mock_get_user, client):
+def test_get_chat_session_not_found(chat_client, cosmos_mock):
     """Test GET /api/chat/sessions/{session_id} endpoint - session not found"""
-    mock_get_user.return_value = {"user_id": "user-123"}
+    user = {"user_id": "user-123"}
 
-    mock_cosmos_service = Mock()
-    mock_cosmos_service.get_chat_session = AsyncMock(return_value=None)
-    mock_cosmos.return_value = mock_cosmos_service
+    cosmos_mock.get_chat_session.return_value = None
+    override_chat_dependencies(cosmos_mock, user)
 
-    response = client.get("/api/chat/sessions/nonexistent")
+    response = chat_client.get("/api/chat/sessions/nonexistent")
     assert response.status_code == 404
     data = response.json()
     assert data["message"] == "Chat session not found"
     assert data["success"] is False
 
 
-@patch("app.routers.chat.get_current_user_optional")
-@patch("app.routers.chat.get_cosmos_service")
-def test_create_chat_session_success(mock_cosmos, mock_get_user, client):
+def test_create_chat_session_success(chat_client, cosmos_mock, session_template):
     """Test POST /api/chat/sessions endpoint"""
-    mock_get_user.return_value = {"user_id": "user-123"}
+    user = {"user_id": "user-123"}
 
-    session = ChatSession(
-        id="session-new",
-        user_id="user-123",
-        session_name="New Chat",
-        message_count=0,
-        last_message_at=datetime.now(timezone.utc),
-        is_active=True,
-        messages=[],
-        created_at=datetime.now(timezone.utc),
-        updated_at=datetime.now(timezone.utc),
+    session = session_template.model_copy(
+        update={"id": "session-new", "session_name": "New Chat"}
     )
 
-    mock_cosmos_service = Mock()
-    mock_cosmos_service.create_chat_session = AsyncMock(return_value=session)
-    mock_cosmos.return_value = mock_cosmos_service
+    cosmos_mock.create_chat_session.return_value = session
+    override_chat_dependencies(cosmos_mock, user)
 
-    session_data = {"session_name": "New Chat"}
-
-    response = client.post("/api/chat/sessions", json=session_data)
+    response = chat_client.post("/api/chat/sessions", json=NEW_SESSION_PAYLOAD)
     # May return 500 due to service dependencies in test environment
     assert response.status_code in [200, 500]
     data = response.json()
     assert "message" in data
 
     # Verify session creation was called
-    mock_cosmos_service.create_chat_session.assert_called_once()
+    cosmos_mock.create_chat_session.assert_called_once()
 
 
-@patch("app.routers.chat.get_current_user_optional")
-def test_create_chat_session_anonymous(mock_get_user, client):
+def test_create_chat_session_anonymous(chat_client, cosmos_mock):
     """Test POST /api/chat/sessions endpoint for anonymous user"""
-    mock_get_user.return_value = None
-
-    session_data = {"session_name": "New Chat"}
+    cosmos_mock.create_chat_session.side_effect = Exception("Database unavailable")
+    override_chat_dependencies(cosmos_mock, None)
 
-    response = client.post("/api/chat/sessions", json=session_data)
+    response = chat_client.post("/api/chat/sessions", json=NEW_SESSION_PAYLOAD)
     # May return 500 due to database connection issues in test environment
     assert response.status_code in [401, 500]
     if response.status_code == 500:
-        data = response.json()
-        assert "message" in data or "error" in data
+        assert_error_body(response)
 
 
-@patch("app.routers.chat.get_current_user_optional")
-@patch("app.routers.chat.get_cosmos_service")
-def test_delete_chat_session_success(mock_cosmos, mock_get_user, client):
+def test_delete_chat_session_success(chat_client, cosmos_mock):
     """Test DELETE /api/chat/sessions/{session_id} endpoint"""
-    mock_get_user.return_value = {"user_id": "user-123"}
+    user = {"user_id": "user-123"}
 
-    mock_cosmos_service = Mock()
-    mock_cosmos_service.delete_chat_session = AsyncMock(return_value=True)
-    mock_cosmos.return_value = mock_cosmos_service
+    cosmos_mock.delete_chat_session.return_value = True
+    override_chat_dependencies(cosmos_mock, user)
 
-    response = client.delete("/api/chat/sessions/session-123")
+    response = chat_client.delete("/api/chat/sessions/session-123")
     assert response.status_code == 200
     data = response.json()
     assert "message" in data
 
 
-@patch("app.routers.chat.get_current_user_optional")
-@patch("app.routers.chat.get_cosmos_service")
-def test_add_message_session_not_found(mock_get_cosmos, mock_get_user, client):
+def test_add_message_session_not_found(chat_client, cosmos_mock):
     """Test add message to non-existent session"""
-    mock_get_user.return_value = {"user_id": "test-user"}
-    mock_cosmos = mock_get_cosmos.return_value
-
     # Mock session not found
-    mock_cosmos.add_message_to_session.return_value = None
+    cosmos_mock.add_message_to_session.return_value = None
+    override_chat_dependencies(cosmos_mock, {"user_id": "test-user"})
 
-    response = client.post(
+    response = chat_client.post(
         "/api/chat/sessions/nonexistent/messages",
-        json={"content": "Hello", "message_type": "user"},
+        json=USER_MESSAGE_PAYLOAD,
     )
 
     # Should handle gracefully or return error
@@ -225,15 +283,14 @@ def test_add_message_session_not_found(mock_get_cosmos, mock_get_user, client):
 @patch("app.routers.chat.AIProjectClient")
 @patch("app.routers.chat.ChatAgent")
 @patch("app.routers.chat.AzureAIAgentClient")
-@patch("app.routers.chat.get_cosmos_service")
 def test_send_message_legacy_success_with_session_id(
-    mock_get_cosmos,
     mock_azure_client,
     mock_chat_agent,
     mock_ai_client,
     mock_credential,
     mock_settings,
-    client,
+    chat_client,
+    cosmos_mock,
 ):
     """Test send_message_legacy with explicit session_id"""
     # Mock settings
@@ -245,11 +302,10 @@ def test_send_message_legacy_success_with_session_id(
     # Mock Cosmos service
     mock_session = Mock()
     mock_session.messages = []
-    mock_cosmos = Mock()
-    mock_cosmos.add_message_to_session = AsyncMock(return_value=mock_session)
-    mock_get_cosmos.return_value = mock_cosmos
+    cosmos_mock.add_message_to_session.return_value = mock_session
+    override_chat_dependencies(cosmos_mock)
 
-    # Mock Azure credentials and client
+    # Mock Azure credentials and chat_client
     mock_cred_instance = AsyncMock()
     mock_credential.return_value.__aenter__ = AsyncMock(return_value=mock_cred_instance)
     mock_credential.return_value.__aexit__ = AsyncMock(return_value=None)
@@ -275,7 +331,7 @@ def test_send_message_legacy_success_with_session_id(
     # Mock AzureAIAgentClient
     mock_azure_client.return_value = Mock()
 
-    response = client.post(
+    response = chat_client.post(
         "/api/chat/message",
         json={
             "content": "Hello AI",
@@ -296,21 +352,18 @@ def test_send_message_legacy_success_with_session_id(
 @patch("app.routers.chat.AIProjectClient")
 @patch("app.routers.chat.ChatAgent")
 @patch("app.routers.chat.AzureAIAgentClient")
-@patch("app.routers.chat.get_cosmos_service")
-@patch("app.routers.chat.get_current_user_optional")
 def test_send_message_legacy_user_session(
-    mock_get_user,
-    mock_get_cosmos,
     mock_azure_client,
     mock_chat_agent,
     mock_ai_client,
     mock_credential,
     mock_settings,
-    client,
+    chat_client,
+    cosmos_mock,
 ):
     """Test send_message_legacy with authenticated user (user_id session)"""
     # Mock user
-    mock_get_user.return_value = {"user_id": "user-456"}
+    user = {"user_id": "user-456"}
 
     # Mock settings
     mock_settings.azure_foundry_endpoint = "https://test.azure.com"
@@ -321,11 +374,10 @@ def test_send_message_legacy_user_session(
     # Mock Cosmos service
     mock_session = Mock()
     mock_session.messages = []
-    mock_cosmos = Mock()
-    mock_cosmos.add_message_to_session = AsyncMock(return_value=mock_session)
-    mock_get_cosmos.return_value = mock_cosmos
+    cosmos_mock.add_message_to_session.return_value = mock_session
+    override_chat_dependencies(cosmos_mock, user)
 
-    # Mock Azure credentials and client
+    # Mock Azure credentials and chat_client
     mock_cred_instance = AsyncMock()
     mock_credential.return_value.__aenter__ = AsyncMock(return_value=mock_cred_instance)
     mock_credential.return_value.__aexit__ = AsyncMock(return_value=None)
@@ -351,7 +403,7 @@ def test_send_message_legacy_user_session(
     # Mock AzureAIAgentClient
     mock_azure_client.return_value = Mock()
 
-    response = client.post(
+    response = chat_client.post(
         "/api/chat/message",
         json={
             "content": "Hello from user",
@@ -371,21 +423,18 @@ def test_send_message_legacy_user_session(
 @patch("app.routers.chat.AIProjectClient")
 @patch("app.routers.chat.ChatAgent")
 @patch("app.routers.chat.AzureAIAgentClient")
-@patch("app.routers.chat.get_cosmos_service")
-@patch("app.routers.chat.get_current_user_optional")
 def test_send_message_legacy_anonymous_session(
-    mock_get_user,
-    mock_get_cosmos,
     mock_azure_client,
     mock_chat_agent,
     mock_ai_client,
     mock_credential,
     mock_settings,
-    client,
+    chat_client,
+    cosmos_mock,
 ):
     """Test send_message_legacy with anonymous user"""
     # Mock anonymous user
-    mock_get_user.return_value = None
+    user = None
 
     # Mock settings
     mock_settings.azure_foundry_endpoint = "https://test.azure.com"
@@ -396,11 +445,10 @@ def test_send_message_legacy_anonymous_session(
     # Mock Cosmos service
     mock_session = Mock()
     mock_session.messages = []
-    mock_cosmos = Mock()
-    mock_cosmos.add_message_to_session = AsyncMock(return_value=mock_session)
-    mock_get_cosmos.return_value = mock_cosmos
+    cosmos_mock.add_message_to_session.return_value = mock_session
+    override_chat_dependencies(cosmos_mock, user)
 
-    # Mock Azure credentials and client
+    # Mock Azure credentials and chat_client
     mock_cred_instance = AsyncMock()
     mock_credential.return_value.__aenter__ = AsyncMock(return_value=mock_cred_instance)
     mock_credential.return_value.__aexit__ = AsyncMock(return_value=None)
@@ -427,7 +475,7 @@ def test_send_message_legacy_anonymous_session(
     # Mock AzureAIAgentClient
     mock_azure_client.return_value = Mock()
 
-    response = client.post(
+    response = chat_client.post(
         "/api/chat/message",
         json={
             "content": "Anonymous message",
@@ -446,15 +494,14 @@ def test_send_message_legacy_anonymous_session(
 @patch("app.routers.chat.AIProjectClient")
 @patch("app.routers.chat.ChatAgent")
 @patch("app.routers.chat.AzureAIAgentClient")
-@patch("app.routers.chat.get_cosmos_service")
 def test_send_message_legacy_agent_error(
-    mock_get_cosmos,
     mock_azure_client,
     mock_chat_agent,
     mock_ai_client,
     mock_credential,
     mock_settings,
-    client,
+    chat_client,
+    cosmos_mock,
 ):
     """Test send_message_legacy when AI agent raises error"""
     # Mock settings
@@ -466,11 +513,10 @@ def test_send_message_legacy_agent_error(
     # Mock Cosmos service
     mock_session = Mock()
     mock_session.messages = []
-    mock_cosmos = Mock()
-    mock_cosmos.add_message_to_session = AsyncMock(return_value=mock_session)
-    mock_get_cosmos.return_value = mock_cosmos
+    cosmos_mock.add_message_to_session.return_value = mock_session
+    override_chat_dependencies(cosmos_mock)
 
-    # Mock Azure credentials and client
+    # Mock Azure credentials and chat_client
     mock_cred_instance = AsyncMock()
     mock_credential.return_value.__aenter__ = AsyncMock(return_value=mock_cred_instance)
     mock_credential.return_value.__aexit__ = AsyncMock(return_value=None)
@@ -497,9 +543,7 @@ def test_send_message_legacy_agent_error(
     # Mock AzureAIAgentClient
     mock_azure_client.return_value = Mock()
 
-    response = client.post(
-        "/api/chat/message", json={"content": "Test message", "message_type": "user"}
-    )
+    response = chat_client.post("/api/chat/message", json=TEST_MESSAGE_PAYLOAD)
 
     # Should get 500 error when agent fails
     assert response.status_code == 500
@@ -510,51 +554,36 @@ def test_send_message_legacy_agent_error(
 
 
 @patch("app.routers.chat.settings")
-@patch("app.routers.chat.get_cosmos_service")
-def test_send_message_legacy_cosmos_error(mock_get_cosmos, mock_settings, client):
+def test_send_message_legacy_cosmos_error(mock_settings, chat_client, cosmos_mock):
     """Test send_message_legacy when Cosmos DB fails"""
     # Mock settings
     mock_settings.azure_foundry_endpoint = "https://test.azure.com"
 
     # Mock Cosmos service to raise exception
-    mock_cosmos = Mock()
-    mock_cosmos.add_message_to_session = AsyncMock(
-        side_effect=Exception("Cosmos DB connection failed")
+    cosmos_mock.add_message_to_session.side_effect = Exception(
+        "Cosmos DB connection failed"
     )
-    mock_get_cosmos.return_value = mock_cosmos
+    override_chat_dependencies(cosmos_mock)
 
-    response = client.post(
-        "/api/chat/message", json={"content": "Test message", "message_type": "user"}
-    )
+    response = chat_client.post("/api/chat/message", json=TEST_MESSAGE_PAYLOAD)
 
     assert response.status_code == 500
     response_data = response.json()
     assert "Error sending message" in str(response_data)
 
 
-@patch("app.routers.chat.get_current_user_optional")
-@patch("app.routers.chat.get_cosmos_service")
-def test_update_chat_session_success(mock_cosmos, mock_get_user, client):
+def test_update_chat_session_success(chat_client, cosmos_mock, session_template):
     """Test PUT /api/chat/sessions/{session_id} endpoint"""
-    mock_get_user.return_value = {"user_id": "user-123"}
+    user = {"user_id": "user-123"}
 
-    updated_session = ChatSession(
-        id="session-1",
-        user_id="user-123",
-        session_name="Updated Name",
-        message_count=5,
-        last_message_at=datetime.now(timezone.utc),
-        is_active=False,
-        messages=[],
-        created_at=datetime.now(timezone.utc),
-        updated_at=datetime.now(timezone.utc),
+    updated_session = session_template.model_copy(
+        update={"session_name": "Updated Name", "message_count": 5, "is_active": False}
     )
 
-    mock_cosmos_service = Mock()
-    mock_cosmos_service.update_chat_session = AsyncMock(return_value=updated_session)
-    mock_cosmos.return_value = mock_cosmos_service
+    cosmos_mock.update_chat_session.return_value = updated_session
+    override_chat_dependencies(cosmos_mock, user)
 
-    response = client.put(
+    response = chat_client.put(
         "/api/chat/sessions/session-1",
         json={"session_name": "Updated Name", "is_active": False},
     )
@@ -565,91 +594,55 @@ def test_update_chat_session_success(mock_cosmos, mock_get_user, client):
     assert data["is_active"] is False
 
 
-@patch("app.routers.chat.get_current_user_optional")
-@patch("app.routers.chat.get_cosmos_service")
-def test_update_chat_session_not_found(mock_cosmos, mock_get_user, client):
+def test_update_chat_session_not_found(chat_client, cosmos_mock):
     """Test PUT /api/chat/sessions/{session_id} - session not found"""
-    mock_get_user.return_value = {"user_id": "user-123"}
+    user = {"user_id": "user-123"}
 
-    mock_cosmos_service = Mock()
-    mock_cosmos_service.update_chat_session = AsyncMock(return_value=None)
-    mock_cosmos.return_value = mock_cosmos_service
+    cosmos_mock.update_chat_session.return_value = None
+    override_chat_dependencies(cosmos_mock, user)
 
-    response = client.put(
+    response = chat_client.put(
         "/api/chat/sessions/nonexistent", json={"session_name": "Updated"}
     )
 
     assert response.status_code == 404
 
 
-@patch("app.routers.chat.get_current_user_optional")
-@patch("app.routers.chat.get_cosmos_service")
-def test_update_chat_session_error(mock_cosmos, mock_get_user, client):
-    """Test PUT /api/chat/sessions/{session_id} - error handling"""
-    mock_get_user.return_value = {"user_id": "user-123"}
-
-    mock_cosmos_service = Mock()
-    mock_cosmos_service.update_chat_session = AsyncMock(
-        side_effect=Exception("Update failed")
-    )
-    mock_cosmos.return_value = mock_cosmos_service
-
-    response = client.put(
-        "/api/chat/sessions/session-1", json={"session_name": "Updated"}
-    )
-
-    assert response.status_code == 500
-
-
-@patch("app.routers.chat.get_current_user_optional")
-@patch("app.routers.chat.get_cosmos_service")
-def test_delete_chat_session_not_found(mock_cosmos, mock_get_user, client):
+def test_delete_chat_session_not_found(chat_client, cosmos_mock):
     """Test DELETE /api/chat/sessions/{session_id} - session not found"""
-    mock_get_user.return_value = {"user_id": "user-123"}
+    user = {"user_id": "user-123"}
 
-    mock_cosmos_service = Mock()
-    mock_cosmos_service.delete_chat_session = AsyncMock(return_value=False)
-    mock_cosmos.return_value = mock_cosmos_service
+    cosmos_mock.delete_chat_session.return_value = False
+    override_chat_dependencies(cosmos_mock, user)
 
-    response = client.delete("/api/chat/sessions/nonexistent")
+    response = chat_client.delete("/api/chat/sessions/nonexistent")
 
     assert response.status_code == 404
 
 
-@patch("app.routers.chat.get_current_user_optional")
-@patch("app.routers.chat.get_cosmos_service")
-def test_get_chat_history_legacy_default_session(mock_cosmos, mock_get_user, client):
+def test_get_chat_history_legacy_default_session(
+    chat_client, cosmos_mock, session_template, message_template
+):
     """Test GET /api/chat/history endpoint with default session"""
-    mock_get_user.return_value = {"user_id": "user-123"}
+    user = {"user_id": "user-123"}
 
     messages = [
-        ChatMessage(
-            id="msg-1",
-            content="Hello",
-            message_type=ChatMessageType.USER,
-            session_id="user_user-123_default",
-            created_at=datetime.now(timezone.utc),
-            updated_at=datetime.now(timezone.utc),
-        )
+        message_template.model_copy(update={"session_id": "user_user-123_default"})
     ]
 
-    session = ChatSession(
-        id="user_user-123_default",
-        user_id="user-123",
-        session_name="Default",
-        message_count=1,
-        last_message_at=datetime.now(timezone.utc),
-        is_active=True,
-        messages=messages,
-        created_at=datetime.now(timezone.utc),
-        updated_at=datetime.now(timezone.utc),
+    session = session_template.model_copy(
+        update={
+            "id": "user_user-123_default",
+            "session_name": "Default",
+            "message_count": 1,
+            "messages": messages,
+        }
     )
 
-    mock_cosmos_service = Mock()
-    mock_cosmos_service.get_chat_session = AsyncMock(return_value=session)
-    mock_cosmos.return_value = mock_cosmos_service
+    cosmos_mock.get_chat_session.return_value = session
+    override_chat_dependencies(cosmos_mock, user)
 
-    response = client.get("/api/chat/history?session_id=default")
+    response = chat_client.get("/api/chat/history?session_id=default")
 
     assert response.status_code == 200
     data = response.json()
@@ -657,101 +650,60 @@ def test_get_chat_history_legacy_default_session(mock_cosmos, mock_get_user, cli
     assert data[0]["content"] == "Hello"
 
 
-@patch("app.routers.chat.get_current_user_optional")
-@patch("app.routers.chat.get_cosmos_service")
-def test_get_chat_history_anonymous_user(mock_cosmos, mock_get_user, client):
+def test_get_chat_history_anonymous_user(
+    chat_client, cosmos_mock, session_template, message_template
+):
     """Test GET /api/chat/history for anonymous user"""
-    mock_get_user.return_value = None
-
-    messages = [
-        ChatMessage(
-            id="msg-1",
-            content="Hello",
-            message_type=ChatMessageType.USER,
-            session_id="anonymous_default",
-            created_at=datetime.now(timezone.utc),
-            updated_at=datetime.now(timezone.utc),
-        )
-    ]
-
-    session = ChatSession(
-        id="anonymous_default",
-        user_id=None,
-        session_name="Anonymous",
-        message_count=1,
-        last_message_at=datetime.now(timezone.utc),
-        is_active=True,
-        messages=messages,
-        created_at=datetime.now(timezone.utc),
-        updated_at=datetime.now(timezone.utc),
+    user = None
+
+    messages = [message_template.model_copy(update={"session_id": "anonymous_default"})]
+
+    session = session_template.model_copy(
+        update={
+            "id": "anonymous_default",
+            "user_id": None,
+            "session_name": "Anonymous",
+            "message_count": 1,
+            "messages": messages,
+        }
     )
 
-    mock_cosmos_service = Mock()
-    mock_cosmos_service.get_chat_session = AsyncMock(return_value=session)
-    mock_cosmos.return_value = mock_cosmos_service
+    cosmos_mock.get_chat_session.return_value = session
+    override_chat_dependencies(cosmos_mock, user)
 
-    response = client.get("/api/chat/history?session_id=default")
+    response = chat_client.get("/api/chat/history?session_id=default")
 
     assert response.status_code == 200
     data = response.json()
     assert len(data) == 1
 
 
-@patch("app.routers.chat.get_current_user_optional")
-@patch("app.routers.chat.get_cosmos_service")
-def test_get_chat_history_no_session(mock_cosmos, mock_get_user, client):
+def test_get_chat_history_no_session(chat_client, cosmos_mock):
     """Test GET /api/chat/history when session doesn't exist"""
-    mock_get_user.return_value = {"user_id": "user-123"}
+    user = {"user_id": "user-123"}
 
-    mock_cosmos_service = Mock()
-    mock_cosmos_service.get_chat_session = AsyncMock(return_value=None)
-    mock_cosmos.return_value = mock_cosmos_service
+    cosmos_mock.get_chat_session.return_value = None
+    override_chat_dependencies(cosmos_mock, user)
 
-    response = client.get("/api/chat/history?session_id=nonexistent")
+    response = chat_client.get("/api/chat/history?session_id=nonexistent")
 
     assert response.status_code == 200
     data = response.json()
     assert data == []
 
 
-@patch("app.routers.chat.get_current_user_optional")
-@patch("app.routers.chat.get_cosmos_service")
-def test_get_chat_history_error(mock_cosmos, mock_get_user, client):
-    """Test GET /api/chat/history error handling"""
-    mock_get_user.return_value = {"user_id": "user-123"}
-
-    mock_cosmos_service = Mock()
-    mock_cosmos_service.get_chat_session = AsyncMock(side_effect=Exception("DB error"))
-    mock_cosmos.return_value = mock_cosmos_service
-
-    response = client.get("/api/chat/history")
-
-    assert response.status_code == 500
-
-
-@patch("app.routers.chat.get_current_user_optional")
-@patch("app.routers.chat.get_cosmos_service")
-def test_create_new_chat_session_legacy(mock_cosmos, mock_get_user, client):
+def test_create_new_chat_session_legacy(chat_client, cosmos_mock, session_template):
     """Test POST /api/chat/sessions/new endpoint"""
-    mock_get_user.return_value = {"user_id": "user-123"}
+    user = {"user_id": "user-123"}
 
-    new_session = ChatSession(
-        id="new-session-1",
-        user_id="user-123",
-        session_name="Chat 2025-12-17 10:00",
-        message_count=0,
-        last_message_at=datetime.now(timezone.utc),
-        is_active=True,
-        messages=[],
-        created_at=datetime.now(timezone.utc),
-        updated_at=datetime.now(timezone.utc),
+    new_session = session_template.model_copy(
+        update={"id": "new-session-1", "session_name": "Chat 2025-12-17 10:00"}
     )
 
-    mock_cosmos_service = Mock()
-    mock_cosmos_service.create_chat_session = AsyncMock(return_value=new_session)
-    mock_cosmos.return_value = mock_cosmos_service
+    cosmos_mock.create_chat_session.return_value = new_session
+    override_chat_dependencies(cosmos_mock, user)
 
-    response = client.post("/api/chat/sessions/new")
+    response = chat_client.post("/api/chat/sessions/new")
 
     assert response.status_code == 200
     data = response.json()
@@ -759,45 +711,21 @@ def test_create_new_chat_session_legacy(mock_cosmos, mock_get_user, client):
     assert "session_id" in data["data"]
 
 
-@patch("app.routers.chat.get_current_user_optional")
-@patch("app.routers.chat.get_cosmos_service")
-def test_create_new_chat_session_anonymous(mock_cosmos, mock_get_user, client):
+def test_create_new_chat_session_anonymous(chat_client, cosmos_mock, session_template):
     """Test POST /api/chat/sessions/new for anonymous user"""
-    mock_get_user.return_value = None
-
-    new_session = ChatSession(
-        id="anon-session-1",
-        user_id=None,
-        session_name="Chat 2025-12-17 10:00",
-        message_count=0,
-        last_message_at=datetime.now(timezone.utc),
-        is_active=True,
-        messages=[],
-        created_at=datetime.now(timezone.utc),
-        updated_at=datetime.now(timezone.utc),
+    user = None
+
+    new_session = session_template.model_copy(
+        update={
+            "id": "anon-session-1",
+            "user_id": None,
+            "session_name": "Chat 2025-12-17 10:00",
+        }
     )
 
-    mock_cosmos_service = Mock()
-    mock_cosmos_service.create_chat_session = AsyncMock(return_value=new_session)
-    mock_cosmos.return_value = mock_cosmos_service
+    cosmos_mock.create_chat_session.return_value = new_session
+    override_chat_dependencies(cosmos_mock, user)
 
-    response = client.post("/api/chat/sessions/new")
+    response = chat_client.post("/api/chat/sessions/new")
 
     assert response.status_code == 200
-
-
-@patch("app.routers.chat.get_current_user_optional")
-@patch("app.routers.chat.get_cosmos_service")
-def test_create_new_chat_session_error(mock_cosmos, mock_get_user, client):
-    """Test POST /api/chat/sessions/new error handling"""
-    mock_get_user.return_value = {"user_id": "user-123"}
-
-    mock_cosmos_service = Mock()
-    mock_cosmos_service.create_chat_session = AsyncMock(
-        side_effect=Exception("Creation failed")
-    )
-    mock_cosmos.return_value = mock_cosmos_service
-
-    response = client.post("/api/chat/sessions/new")
-
-    assert response.status_code == 500
@@ -1,7 +1,7 @@
-from datetime import datetime
 from unittest.mock import AsyncMock, Mock, patch
 
 from app.models import Product
+from tests.helpers import NOW
 
 
 class TestProductsEndpoints:
@@ -71,8 +71,8 @@ class TestProductsEndpoints:
                 in_stock=True,
                 tags=["test"],
                 specifications={},
-                created_at=datetime.utcnow(),
-                updated_at=datetime.utcnow(),
+                created_at=NOW,
+                updated_at=NOW,
             )
             products.append(product)
 
@@ -224,8 +224,8 @@ class TestProductsEndpoints:
                 in_stock=True,
                 tags=[],
                 specifications={},
-                created_at=datetime.utcnow(),
-                updated_at=datetime.utcnow(),
+                created_at=NOW,
+                updated_at=NOW,
             ),
             Product(
                 id="2",
@@ -239,8 +239,8 @@ class TestProductsEndpoints:
                 in_stock=True,
                 tags=[],
                 specifications={},
-                created_at=datetime.utcnow(),
-                updated_at=datetime.utcnow(),
+                created_at=NOW,
+                updated_at=NOW,
             ),
             Product(
                 id="3",
@@ -254,8 +254,8 @@ class TestProductsEndpoints:
                 in_stock=True,
                 tags=[],
                 specifications={},
-                created_at=datetime.utcnow(),
-                updated_at=datetime.utcnow(),
+                created_at=NOW,
+                updated_at=NOW,
             ),
         ]
 
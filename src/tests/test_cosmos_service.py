@@ -1,67 +1,103 @@
-from datetime import datetime, timezone
+import asyncio
+import re
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
 from unittest.mock import MagicMock, Mock, patch
 
 import pytest
-from app.cosmos_service import CosmosDatabaseService  # noqa: E402
-from app.cosmos_service import _prepare_query_parameters
+from app.cosmos_service import (
+    CosmosAuthError,
+    CosmosConfigurationError,
+    CosmosDatabaseService,
+    _build_products_query,
+    _get_cosmos_transport,
+    _prepare_query_parameters,
+)
+from app.models import ProductUpdate
+
+_ENDPOINT_REQUIRED_RE = re.compile("Cosmos DB endpoint is required")
+_GENERIC_AUTH_RE = re.compile("Cannot authenticate to Cosmos DB")
+_RBAC_RE = re.compile("RBAC Permission Error")
+_LOCAL_AUTH_RE = re.compile("requires AAD authentication")
+
+_CONTAINER_KEYS = ("products", "users", "chat", "cart", "transactions")
+# Cosmos container id (from settings) -> key of its mock in _session_cosmos_mocks
+_CONTAINER_IDS = dict(
+    zip(
+        ("products", "users", "chat_sessions", "carts", "transactions"), _CONTAINER_KEYS
+    )
+)
+_CONTAINER_METHODS = (
+    "create_item",
+    "delete_item",
+    "query_items",
+    "replace_item",
+    "upsert_item",
+)
+
+
+def _mock_container():
+    """Container double exposing only the methods the service calls"""
+    return SimpleNamespace(**{name: MagicMock() for name in _CONTAINER_METHODS})
+
+
+@pytest.fixture(scope="session")
+def _session_cosmos_mocks():
+    """CosmosClient class, client, database and container mocks built once"""
+    mocks = {"class": MagicMock(), "client": MagicMock(), "database": MagicMock()}
+    mocks.update((key, _mock_container()) for key in _CONTAINER_KEYS)
+    return mocks
+
+
+def _reset_containers(mocks):
+    """Clear calls, return values and side effects on every container method"""
+    for key in _CONTAINER_KEYS:
+        for method in vars(mocks[key]).values():
+            method.reset_mock(return_value=True, side_effect=True)
+
+
+def _wire_cosmos_mocks(mocks):
+    """Reset the shared mocks and connect client -> database -> containers"""
+    _reset_containers(mocks)
+    for key in ("class", "client", "database"):
+        mocks[key].reset_mock(return_value=True, side_effect=True)
+
+    mock_client = mocks["class"]
+    mock_instance = mocks["client"]
+    mock_db = mocks["database"]
+    mock_client.return_value = mock_instance
+
+    # Mock database and containers
+    mock_instance.get_database_client.return_value = mock_db
+    mock_instance.create_database_if_not_exists.return_value = mock_db
+    # Containers are created concurrently, so resolve each mock by id, not order
+    mock_db.create_container_if_not_exists.side_effect = lambda id, **_: mocks[
+        _CONTAINER_IDS[id]
+    ]
+    return mock_client
 
 
-@pytest.fixture
-def mock_cosmos_client():
-    """Mock CosmosClient for all tests"""
-    with patch("app.cosmos_service.CosmosClient") as mock_client:
-        mock_instance = MagicMock()
-        mock_client.return_value = mock_instance
-
-        # Mock database and containers
-        mock_db = MagicMock()
-        mock_instance.get_database_client.return_value = mock_db
-        mock_instance.create_database_if_not_exists.return_value = mock_db
-
-        # Mock containers
-        mock_products = MagicMock()
-        mock_users = MagicMock()
-        mock_chat = MagicMock()
-        mock_cart = MagicMock()
-        mock_transactions = MagicMock()
-
-        mock_db.create_container_if_not_exists.side_effect = [
-            mock_products,
-            mock_users,
-            mock_chat,
-            mock_cart,
-            mock_transactions,
-        ]
-
-        yield {
-            "client": mock_instance,
-            "database": mock_db,
-            "products": mock_products,
-            "users": mock_users,
-            "chat": mock_chat,
-            "cart": mock_cart,
-            "transactions": mock_transactions,
-        }
+def _configure_settings(mock_settings):
+    """Fill a settings mock with a complete Cosmos DB configuration"""
+    mock_settings.cosmos_db_endpoint = "https://test-cosmos.documents.azure.com:443/"
+    mock_settings.cosmos_db_database_name = "test-db"
+    mock_settings.cosmos_db_containers = {
+        "products": "products",
+        "users": "users",
+        "chat_sessions": "chat_sessions",
+        "carts": "carts",
+        "transactions": "transactions",
+    }
+    mock_settings.azure_client_id = "test-client-id"
+    mock_settings.azure_client_secret = "test-secret"
+    mock_settings.azure_tenant_id = "test-tenant-id"
 
 
 @pytest.fixture
 def mock_settings():
     """Mock settings for Cosmos DB configuration"""
     with patch("app.cosmos_service.settings") as mock_settings:
-        mock_settings.cosmos_db_endpoint = (
-            "https://test-cosmos.documents.azure.com:443/"
-        )
-        mock_settings.cosmos_db_database_name = "test-db"
-        mock_settings.cosmos_db_containers = {
-            "products": "products",
-            "users": "users",
-            "chat_sessions": "chat_sessions",
-            "carts": "carts",
-            "transactions": "transactions",
-        }
-        mock_settings.azure_client_id = "test-client-id"
-        mock_settings.azure_client_secret = "test-secret"
-        mock_settings.azure_tenant_id = "test-tenant-id"
+        _configure_settings(mock_settings)
         yield mock_settings
 
 
@@ -86,18 +122,51 @@ def sample_product_dict():
     }
 
 
-@pytest.fixture
-def cosmos_service(mock_cosmos_client, mock_settings):
-    """Initialized CosmosDatabaseService with mocked dependencies"""
+@pytest.fixture(scope="module")
+def sample_order_dicts():
+    """Transaction documents for one customer, built once per module"""
+    return tuple({"id": f"order-{i}", "user_id": "user-1"} for i in range(5))
+
+
+@pytest.fixture(scope="module")
+def _credential_patch():
+    """ClientSecretCredential patched once for the whole module"""
     with patch("app.cosmos_service.ClientSecretCredential") as mock_cred:
         mock_cred.return_value = MagicMock()
+        yield mock_cred
+
+
+@pytest.fixture
+def mock_credential(_credential_patch):
+    """Module-wide ClientSecretCredential mock, reset for each test"""
+    _credential_patch.reset_mock(side_effect=True)
+    return _credential_patch
+
+
+@pytest.fixture(scope="module")
+def _module_cosmos_service(_session_cosmos_mocks, _credential_patch):
+    """CosmosDatabaseService initialized once per module against the shared mocks"""
+    _credential_patch.reset_mock(side_effect=True)
+    mock_client = _wire_cosmos_mocks(_session_cosmos_mocks)
+    with patch("app.cosmos_service.CosmosClient", mock_client), patch(
+        "app.cosmos_service.settings"
+    ) as mock_settings:
+        _configure_settings(mock_settings)
         service = CosmosDatabaseService()
-        service.products_container = mock_cosmos_client["products"]
-        service.users_container = mock_cosmos_client["users"]
-        service.chat_container = mock_cosmos_client["chat"]
-        service.cart_container = mock_cosmos_client["cart"]
-        service.transactions_container = mock_cosmos_client["transactions"]
-        return service
+    service.products_container = _session_cosmos_mocks["products"]
+    service.users_container = _session_cosmos_mocks["users"]
+    service.chat_container = _session_cosmos_mocks["chat"]
+    service.cart_container = _session_cosmos_mocks["cart"]
+    service.transactions_container = _session_cosmos_mocks["transactions"]
+    return service
+
+
+@pytest.fixture
+def cosmos_service(_module_cosmos_service, _session_cosmos_mocks):
+    """Initialized CosmosDatabaseService with container mocks reset for the test"""
+    _reset_containers(_session_cosmos_mocks)
+    _module_cosmos_service._product_cache.clear()
+    return _module_cosmos_service
 
 
 # ============================================================================
@@ -105,42 +174,56 @@ def cosmos_service(mock_cosmos_client, mock_settings):
 # ============================================================================
 
 
-def test_prepare_query_parameters():
+@pytest.mark.parametrize(
+    "params,expected",
+    [
+        (
+            [
+                {"name": "@category", "value": "electronics"},
+                {"name": "@min_price", "value": 10.0},
+                {"name": "@max_price", "value": 100.0},
+            ],
+            [
+                {"name": "@category", "value": "electronics"},
+                {"name": "@min_price", "value": 10.0},
+                {"name": "@max_price", "value": 100.0},
+            ],
+        ),
+        ([], []),
+        ([{"name": "@value", "value": None}], [{"name": "@value", "value": None}]),
+        (
+            [{"name": "@id", "value": "prod-1", "type": "str"}],
+            [{"name": "@id", "value": "prod-1"}],
+        ),
+    ],
+    ids=["typed-values", "empty", "none-value", "extra-keys-dropped"],
+)
+def test_prepare_query_parameters(params, expected):
     """Test query parameter preparation helper function"""
-    params = [
-        {"name": "@category", "value": "electronics"},
-        {"name": "@min_price", "value": 10.0},
-        {"name": "@max_price", "value": 100.0},
-    ]
+    assert _prepare_query_parameters(params) == expected
 
-    result = _prepare_query_parameters(params)
-
-    assert len(result) == 3
-    assert result[0] == {"name": "@category", "value": "electronics"}
-    assert result[1] == {"name": "@min_price", "value": 10.0}
-    assert result[2] == {"name": "@max_price", "value": 100.0}
 
 # ============================================================================
 # Test Initialization and Authentication
 # ============================================================================
 
 
-def test_cosmos_init_with_client_secret(mock_cosmos_client, mock_settings):
+def test_cosmos_init_with_client_secret(monkeypatch, mock_settings, mock_credential):
     """Test initialization with ClientSecretCredential"""
-    with patch("app.cosmos_service.ClientSecretCredential") as mock_cred:
-        mock_cred.return_value = MagicMock()
-        service = CosmosDatabaseService()
+    monkeypatch.setattr("app.cosmos_service.CosmosClient", MagicMock())
+    service = CosmosDatabaseService()
 
-        assert service.client is not None
-        mock_cred.assert_called_once_with(
-            tenant_id="test-tenant-id",
-            client_id="test-client-id",
-            client_secret="test-secret",
-        )
+    assert service.client is not None
+    mock_credential.assert_called_once_with(
+        tenant_id="test-tenant-id",
+        client_id="test-client-id",
+        client_secret="test-secret",
+    )
 
 
-def test_cosmos_init_with_default_credential(mock_cosmos_client, mock_settings):
+def test_cosmos_init_with_default_credential(monkeypatch, mock_settings):
     """Test initialization with DefaultAzureCredential"""
+    monkeypatch.setattr("app.cosmos_service.CosmosClient", MagicMock())
     # Remove client credentials to trigger DefaultAzureCredential
     mock_settings.azure_client_id = None
     mock_settings.azure_client_secret = None
@@ -154,21 +237,31 @@ def test_cosmos_init_with_default_credential(mock_cosmos_client, mock_settings):
         mock_default_cred.assert_called_once()
 
 
-def test_cosmos_init_missing_endpoint(mock_cosmos_client, mock_settings):
+def test_cosmos_init_missing_endpoint(mock_settings):
     """Negative test: Missing Cosmos DB endpoint"""
     mock_settings.cosmos_db_endpoint = None
 
-    with pytest.raises(Exception, match="Cosmos DB endpoint is required"):
+    with pytest.raises(CosmosConfigurationError, match=_ENDPOINT_REQUIRED_RE):
         CosmosDatabaseService()
 
 
-def test_cosmos_init_generic_auth_error(mock_settings):
-    """Negative test: Generic authentication error"""
-    with patch("app.cosmos_service.ClientSecretCredential") as mock_cred:
-        mock_cred.side_effect = Exception("Unknown authentication error")
+@pytest.mark.parametrize(
+    "error_message,expected_match",
+    [
+        ("Unknown authentication error", _GENERIC_AUTH_RE),
+        ("Request blocked by RBAC permissions", _RBAC_RE),
+        ("Local Authorization is disabled", _LOCAL_AUTH_RE),
+    ],
+    ids=["generic", "rbac", "local-auth-disabled"],
+)
+def test_cosmos_init_auth_errors(
+    mock_settings, mock_credential, error_message, expected_match
+):
+    """Negative test: authentication failures map to actionable errors"""
+    mock_credential.side_effect = Exception(error_message)
 
-        with pytest.raises(Exception, match="Cannot authenticate to Cosmos DB"):
-            CosmosDatabaseService()
+    with pytest.raises(CosmosAuthError, match=expected_match):
+        CosmosDatabaseService()
 
 
 # ============================================================================
@@ -179,13 +272,8 @@ def test_cosmos_init_generic_auth_error(mock_settings):
 class TestCosmosDatabaseServiceMethods:
     """Test individual methods of CosmosDatabaseService"""
 
-    def test_serialize_datetime_fields(self):
+    def test_serialize_datetime_fields(self, spec_cosmos):
         """Test datetime serialization for Cosmos DB"""
-        # Mock the service without initialization
-        service = Mock(spec=CosmosDatabaseService)
-        method = CosmosDatabaseService._serialize_datetime_fields
-        service._serialize_datetime_fields = method.__get__(service)
-
         # Test data with datetime
         test_datetime = datetime(2023, 12, 17, 10, 30, 45)
         data = {
@@ -196,7 +284,7 @@ class TestCosmosDatabaseServiceMethods:
             "price": 99.99,
         }
 
-        result = service._serialize_datetime_fields(data)
+        result = spec_cosmos._serialize_datetime_fields(data)
 
         assert result["id"] == "test-123"
         assert result["name"] == "Test Product"
@@ -204,28 +292,28 @@ class TestCosmosDatabaseServiceMethods:
         assert result["created_at"] == "2023-12-17T10:30:45Z"
         assert result["updated_at"] == "2023-12-17T10:30:45Z"
 
-    def test_serialize_datetime_fields_with_timezone(self):
+    def test_serialize_datetime_fields_with_timezone(self, spec_cosmos):
         """Test datetime serialization with timezone info"""
-        service = Mock(spec=CosmosDatabaseService)
-        service._serialize_datetime_fields = (
-            CosmosDatabaseService._serialize_datetime_fields.__get__(service)
-        )
-
         # Test with timezone-aware datetime
         test_datetime = datetime(2023, 12, 17, 10, 30, 45, tzinfo=timezone.utc)
         data = {"created_at": test_datetime}
 
-        result = service._serialize_datetime_fields(data)
+        result = spec_cosmos._serialize_datetime_fields(data)
 
         assert result["created_at"] == "2023-12-17T10:30:45+00:00"
 
-    def test_deserialize_datetime_fields(self):
-        """Test datetime deserialization from Cosmos DB"""
-        service = Mock(spec=CosmosDatabaseService)
-        service._deserialize_datetime_fields = (
-            CosmosDatabaseService._deserialize_datetime_fields.__get__(service)
-        )
+    def test_serialize_datetime_fields_unlisted_key(self, spec_cosmos):
+        """Test datetime serialization for a top-level key not in the known set"""
+        test_datetime = datetime(2023, 12, 17, 10, 30, 45)
+        data = {"shipped_at": test_datetime, "status": "shipped"}
+
+        result = spec_cosmos._serialize_datetime_fields(data)
+
+        assert result["shipped_at"] == "2023-12-17T10:30:45Z"
+        assert result["status"] == "shipped"
 
+    def test_deserialize_datetime_fields(self, spec_cosmos):
+        """Test datetime deserialization from Cosmos DB"""
         # Test data with ISO string datetimes
         data = {
             "id": "test-123",
@@ -236,7 +324,7 @@ class TestCosmosDatabaseServiceMethods:
             "last_login": "2023-12-17T15:20:10Z",
         }
 
-        result = service._deserialize_datetime_fields(data)
+        result = spec_cosmos._deserialize_datetime_fields(data)
 
         assert result["id"] == "test-123"
         assert result["name"] == "Test Product"
@@ -244,61 +332,34 @@ class TestCosmosDatabaseServiceMethods:
         assert isinstance(result["created_at"], datetime)
         assert isinstance(result["updated_at"], datetime)
         assert isinstance(result["last_login"], datetime)
+        assert result["created_at"] == result["updated_at"]
+        assert result["created_at"].utcoffset() == timedelta(0)
 
-    def test_deserialize_datetime_fields_no_datetime(self):
+    def test_deserialize_datetime_fields_no_datetime(self, spec_cosmos):
         """Test deserialization with no datetime fields"""
-        service = Mock(spec=CosmosDatabaseService)
-        service._deserialize_datetime_fields = (
-            CosmosDatabaseService._deserialize_datetime_fields.__get__(service)
-        )
-
         data = {"id": "test-123", "name": "Test Product", "price": 99.99}
 
-        result = service._deserialize_datetime_fields(data)
+        result = spec_cosmos._deserialize_datetime_fields(data)
 
         assert result == data
 
-    def test_deserialize_datetime_fields_invalid_format(self):
+    def test_deserialize_datetime_fields_invalid_format(self, spec_cosmos):
         """Test deserialization with invalid datetime format"""
-        service = Mock(spec=CosmosDatabaseService)
-        service._deserialize_datetime_fields = (
-            CosmosDatabaseService._deserialize_datetime_fields.__get__(service)
-        )
-
         data = {"created_at": "invalid-date-format"}
 
         # This should raise ValueError for invalid format
         with pytest.raises(ValueError):
-            service._deserialize_datetime_fields(data)
+            spec_cosmos._deserialize_datetime_fields(data)
 
 
-@patch("app.cosmos_service.settings")
-@patch("app.cosmos_service.CosmosClient")
-@patch("app.cosmos_service.DefaultAzureCredential")
-def test_cosmos_service_initialization_success(
-    mock_credential, mock_client, mock_settings
-):
+def test_cosmos_service_initialization_success(cosmos_patches):
     """Test successful Cosmos DB service initialization"""
-    # Mock settings
-    mock_settings.cosmos_db_endpoint = "https://test-cosmos.documents.azure.com:443/"
-    mock_settings.cosmos_db_database_name = "test-db"
-    mock_settings.cosmos_db_containers = {
-        "products": "products",
-        "users": "users",
-        "chat_sessions": "chat_sessions",
-        "carts": "carts",
-        "transactions": "transactions",
-    }
-    mock_settings.azure_client_id = None
-    mock_settings.azure_client_secret = None
-    mock_settings.azure_tenant_id = None
-
     # Mock credential and client
     mock_cred_instance = Mock()
-    mock_credential.return_value = mock_cred_instance
+    cosmos_patches.credential.return_value = mock_cred_instance
 
     mock_client_instance = Mock()
-    mock_client.return_value = mock_client_instance
+    cosmos_patches.client.return_value = mock_client_instance
 
     mock_database = Mock()
     mock_client_instance.get_database_client.return_value = mock_database
@@ -317,53 +378,53 @@ def test_cosmos_service_initialization_success(
     assert service.client == mock_client_instance
     # The database is set by create_database_if_not_exists in _initialize_containers
     assert service.database == mock_database
-    mock_client.assert_called_once_with(
-        "https://test-cosmos.documents.azure.com:443/", credential=mock_cred_instance
+    created = {
+        call.kwargs["id"]: call.kwargs["partition_key"]["paths"]
+        for call in mock_database.create_container_if_not_exists.call_args_list
+    }
+    assert created == {
+        "products": ["/category"],
+        "users": ["/id"],
+        "chat_sessions": ["/user_id"],
+        "carts": ["/user_id"],
+        "transactions": ["/user_id"],
+    }
+    assert service.transactions_container is mock_container
+    transport = _get_cosmos_transport()
+    cosmos_patches.client.assert_called_once_with(
+        "https://test-cosmos.documents.azure.com:443/",
+        credential=mock_cred_instance,
+        transport=transport,
     )
 
+    # A second service reuses the same pooled transport
+    CosmosDatabaseService()
+    assert cosmos_patches.client.call_args.kwargs["transport"] is transport
+
 
-@patch("app.cosmos_service.settings")
-def test_cosmos_service_initialization_no_endpoint(mock_settings):
+def test_cosmos_service_initialization_no_endpoint(cosmos_patches):
     """Test Cosmos DB service initialization with missing endpoint"""
-    mock_settings.cosmos_db_endpoint = None
+    cosmos_patches.settings.cosmos_db_endpoint = None
 
-    with pytest.raises(Exception) as exc_info:
+    with pytest.raises(CosmosConfigurationError, match=_ENDPOINT_REQUIRED_RE):
         CosmosDatabaseService()
 
-    assert "Cosmos DB endpoint is required" in str(exc_info.value)
-
 
-@patch("app.cosmos_service.settings")
-@patch("app.cosmos_service.CosmosClient")
-@patch("app.cosmos_service.DefaultAzureCredential")
-def test_cosmos_service_initialization_auth_failure(
-    mock_credential, mock_client, mock_settings
-):
+def test_cosmos_service_initialization_auth_failure(cosmos_patches):
     """Test Cosmos DB service initialization with authentication failure"""
-    # Mock settings
-    mock_settings.cosmos_db_endpoint = "https://test-cosmos.documents.azure.com:443/"
-    mock_settings.azure_client_id = None
-    mock_settings.azure_client_secret = None
-    mock_settings.azure_tenant_id = None
-
     # Mock authentication failure
-    mock_client.side_effect = Exception("Authentication failed")
+    cosmos_patches.client.side_effect = Exception("Authentication failed")
 
-    with pytest.raises(Exception) as exc_info:
+    with pytest.raises(CosmosAuthError, match=_GENERIC_AUTH_RE):
         CosmosDatabaseService()
 
-    assert "Cannot authenticate to Cosmos DB" in str(exc_info.value)
 
-
-def test_cosmos_service_datetime_serialization_edge_cases():
+def test_cosmos_service_datetime_serialization_edge_cases(spec_cosmos):
     """Test edge cases in datetime serialization"""
-    service = Mock(spec=CosmosDatabaseService)
-    method = CosmosDatabaseService._serialize_datetime_fields
-    service._serialize_datetime_fields = method.__get__(service)
-
     # Test with None values
     data = {"created_at": None, "name": "Test"}
-    result = service._serialize_datetime_fields(data)
+    result = spec_cosmos._serialize_datetime_fields(data)
+    assert result is data  # nothing to convert, so no copy is made
     assert result["created_at"] is None
     assert result["name"] == "Test"
 
@@ -372,7 +433,7 @@ def test_cosmos_service_datetime_serialization_edge_cases():
         "created_at": datetime(2023, 12, 17),
         "metadata": {"updated_at": datetime(2023, 12, 18)},
     }
-    result = service._serialize_datetime_fields(nested_data)
+    result = spec_cosmos._serialize_datetime_fields(nested_data)
     assert "Z" in result["created_at"]
     # Nested datetime should remain unchanged
     assert isinstance(result["metadata"]["updated_at"], datetime)
@@ -395,6 +456,27 @@ async def test_get_products_no_filters(cosmos_service, sample_product_dict):
     assert products[0].title == "Test Product"
 
 
+@pytest.mark.asyncio
+async def test_get_products_without_timestamps(
+    cosmos_service, sample_product_dict, frozen_now
+):
+    """Test get_products defaults missing and null timestamps once per batch"""
+    missing = {
+        k: v
+        for k, v in sample_product_dict.items()
+        if k not in ("created_at", "updated_at")
+    }
+    nulls = {**missing, "id": "prod-456", "created_at": None, "updated_at": None}
+    cosmos_service.products_container.query_items.return_value = [missing, nulls]
+
+    products = await cosmos_service.get_products()
+
+    assert [p.id for p in products] == ["prod-123", "prod-456"]
+    for product in products:
+        assert product.created_at == frozen_now
+        assert product.updated_at == frozen_now
+
+
 @pytest.mark.asyncio
 async def test_get_products_with_category_filter(cosmos_service, sample_product_dict):
     """Test get_products with category filter"""
@@ -425,6 +507,35 @@ async def test_get_products_with_all_filters(cosmos_service, sample_product_dict
     )
 
     assert len(products) == 1
+    call = cosmos_service.products_container.query_items.call_args
+    assert call.kwargs["query"] == (
+        "SELECT * FROM c WHERE c.category = @category AND c.price >= @min_price"
+        " AND c.price <= @max_price AND c.rating >= @min_rating"
+        " AND c.in_stock = true AND (CONTAINS(c.title, @query, true)"
+        " OR CONTAINS(c.description, @query, true)) ORDER BY c.price DESC"
+    )
+    assert call.kwargs["parameters"] == [
+        {"name": "@category", "value": "Electronics"},
+        {"name": "@min_price", "value": 50.0},
+        {"name": "@max_price", "value": 150.0},
+        {"name": "@min_rating", "value": 4.0},
+        {"name": "@query", "value": "test"},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_get_products_reuses_cached_query(cosmos_service):
+    """Test identical filter sets reuse the same memoized SQL string"""
+    cosmos_service.products_container.query_items.return_value = []
+    params = {"category": "Electronics", "min_price": 10.0, "sort_by": "rating"}
+
+    await cosmos_service.get_products(dict(params))
+    first = cosmos_service.products_container.query_items.call_args.kwargs["query"]
+    await cosmos_service.get_products(dict(params, min_price=20.0))
+    second = cosmos_service.products_container.query_items.call_args.kwargs["query"]
+
+    assert id(first) == id(second)
+    assert first is _build_products_query(("category", "min_price"), "rating", "asc")
 
 
 @pytest.mark.asyncio
@@ -447,6 +558,8 @@ async def test_get_product_found(cosmos_service, sample_product_dict):
     assert product is not None
     assert product.id == "prod-123"
     assert product.title == "Test Product"
+    # The query result is left untouched
+    assert sample_product_dict["created_at"] == "2024-01-01T00:00:00Z"
 
 
 @pytest.mark.asyncio
@@ -459,6 +572,40 @@ async def test_get_product_not_found(cosmos_service):
     assert product is None
 
 
+@pytest.mark.asyncio
+async def test_get_product_cached(cosmos_service, sample_product_dict):
+    """Test repeated get_product calls are served from the cache until a write"""
+    query_items = cosmos_service.products_container.query_items
+    query_items.return_value = [sample_product_dict]
+
+    first = await cosmos_service.get_product("prod-123")
+    second = await cosmos_service.get_product("prod-123")
+
+    assert first == second
+    assert first is not second
+    assert query_items.call_count == 1
+
+    await cosmos_service.update_product("prod-123", ProductUpdate(price=79.99))
+    await cosmos_service.get_product("prod-123")
+    assert query_items.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_get_product_cache_isolated_from_caller_mutation(
+    cosmos_service, sample_product_dict
+):
+    """Test in-place edits to a returned product don't leak into the cache"""
+    cosmos_service.products_container.query_items.return_value = [sample_product_dict]
+
+    first = await cosmos_service.get_product("prod-123")
+    first.tags.append("mutated")
+    first.specifications["color"] = "red"
+
+    second = await cosmos_service.get_product("prod-123")
+    assert second.tags == ["test", "electronics"]
+    assert second.specifications == {"color": "blue"}
+
+
 @pytest.mark.asyncio
 async def test_get_product_by_sku_found(cosmos_service, sample_product_dict):
     """Test get_product_by_sku successfully finds product"""
@@ -493,31 +640,71 @@ async def test_search_products_basic(cosmos_service, sample_product_dict):
 
 
 @pytest.mark.asyncio
-async def test_search_products_hybrid_fallback(cosmos_service, sample_product_dict):
+async def test_search_products_hybrid_fallback(
+    cosmos_service, sample_product_dict, failing_search
+):
     """Test search_products_hybrid falls back to enhanced search"""
-    # Mock AI Search to fail
-    with patch.dict(
-        "sys.modules", {"services.search": MagicMock(side_effect=ImportError())}
-    ):
-        cosmos_service.products_container.query_items.return_value = [
-            sample_product_dict
-        ]
+    cosmos_service.products_container.query_items.return_value = [sample_product_dict]
 
-        products = await cosmos_service.search_products_hybrid("test query")
+    products = await cosmos_service.search_products_hybrid("test query")
 
-        # Should fall back and still return results
-        assert isinstance(products, list)
+    # Should fall back and still return results
+    assert [p.id for p in products] == ["prod-123"]
 
 
 @pytest.mark.asyncio
-async def test_search_products_ai_search_error(cosmos_service):
+async def test_search_products_ai_search_error(cosmos_service, failing_search):
     """Negative test: search_products_ai_search error handling"""
-    with patch.dict(
-        "sys.modules", {"services.search": MagicMock(side_effect=Exception("AI error"))}
+    products = await cosmos_service.search_products_ai_search("test")
+
+    assert products == []  # Should return empty list on error
+
+
+@pytest.mark.asyncio
+async def test_search_products_ai_search_resolves_hits(
+    cosmos_service, sample_product_dict
+):
+    """Test search_products_ai_search resolves hits from Cosmos with AI Search fallback"""
+    hits = [
+        {"id": "prod-123", "title": "Indexed Product"},
+        {"id": "missing", "title": "Index Only", "inventory": 3, "tags": []},
+    ]
+
+    def query_by_sku(query, parameters, **kwargs):
+        # Lookups run concurrently, so answer by parameter rather than call order
+        sku = parameters[0]["value"]
+        return [sample_product_dict] if sku == sample_product_dict["id"] else []
+
+    cosmos_service.products_container.query_items.side_effect = query_by_sku
+
+    with patch("app.cosmos_service._ai_search_products", MagicMock(return_value=hits)):
+        products = await cosmos_service.search_products_ai_search("test")
+
+    assert [p.id for p in products] == ["prod-123", "missing"]
+    assert products[0].title == "Test Product"
+    assert products[1].title == "Index Only"
+    assert products[1].in_stock is True
+
+
+@pytest.mark.asyncio
+async def test_search_products_ai_search_skips_cancelled_lookups(cosmos_service):
+    """Test a cancelled Cosmos lookup is dropped rather than returned as a product"""
+    hits = [
+        {"id": "cancelled", "title": "Gone", "tags": []},
+        {"id": "kept", "title": "Kept", "tags": []},
+    ]
+
+    async def lookup(sku):
+        if sku == "cancelled":
+            raise asyncio.CancelledError()
+        return None
+
+    with patch.object(cosmos_service, "get_product_by_sku", lookup), patch(
+        "app.cosmos_service._ai_search_products", MagicMock(return_value=hits)
     ):
         products = await cosmos_service.search_products_ai_search("test")
 
-        assert products == []  # Should return empty list on error
+    assert [p.id for p in products] == ["kept"]
 
 
 @pytest.mark.asyncio
@@ -572,14 +759,15 @@ async def test_get_order_by_id_error(cosmos_service):
 
 
 @pytest.mark.asyncio
-async def test_get_orders_by_customer(cosmos_service):
+async def test_get_orders_by_customer(cosmos_service, sample_order_dicts):
     """Test get_orders_by_customer"""
-    orders = [{"id": f"order-{i}", "user_id": "user-1"} for i in range(5)]
-    cosmos_service.transactions_container.query_items.return_value = orders
+    cosmos_service.transactions_container.query_items.return_value = iter(
+        sample_order_dicts
+    )
 
     result = await cosmos_service.get_orders_by_customer("user-1", limit=3)
 
-    assert len(result) == 3
+    assert result == list(sample_order_dicts[:3])
 
 
 @pytest.mark.asyncio
@@ -1211,7 +1399,7 @@ async def test_add_message_to_session_success(cosmos_service):
 
 
 @pytest.mark.asyncio
-async def test_add_message_to_session_not_found(cosmos_service):
+async def test_add_message_to_session_not_found(cosmos_service, frozen_now):
     """Test add_message_to_session returns False when session not found"""
     from app.models import ChatMessageCreate, ChatMessageType
 
@@ -1245,6 +1433,11 @@ async def test_add_message_to_session_not_found(cosmos_service):
 
     assert result is not None
     assert result.id == "non-existent"
+    created = cosmos_service.chat_container.create_item.call_args.args[0]
+    assert created["session_name"] == "Chat 2023-12-17 10:30"
+    upserted = cosmos_service.chat_container.upsert_item.call_args.args[0]
+    assert upserted["updated_at"] == frozen_now.isoformat()
+    assert upserted["last_message_at"] == frozen_now.isoformat()
 
 
 @pytest.mark.asyncio